@@ -0,0 +1,160 @@
+"""
+Benchmark suite of the curve operations, for each NIST curve (and each
+hash function for sign/verify).
+Results are printed as ops/sec and latency percentiles, can be saved as
+JSON, and compared with a baseline JSON file to detect regressions.
+
+Run from the root of the repository :
+    python bench/bench.py --json results.json
+    python bench/bench.py --baseline results.json --threshold 0.15
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.primality import primeCache
+
+HASHES = {
+    'SHA-1': hashlib.sha1,
+    'SHA-224': hashlib.sha224,
+    'SHA-256': hashlib.sha256,
+    'SHA-384': hashlib.sha384,
+    'SHA-512': hashlib.sha512,
+}
+
+
+def percentile(sorted_values, q):
+    """ q-th percentile (0 <= q <= 100) of a sorted list """
+    index = (len(sorted_values) - 1) * q / 100.0
+    low = int(index)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] -
+                                 sorted_values[low]) * (index - low)
+
+def measure(fct, iterations):
+    """ Run fct iterations times, return the statistics of the latencies """
+    fct()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fct()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'iterations': iterations,
+        'ops_per_sec': iterations / total if total > 0 else float('inf'),
+        'mean_us': total / iterations * 1e6,
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p90_us': percentile(latencies, 90) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+    }
+
+def curveBenchmarks(name, hashes):
+    """ (operation name, function, relative cost) for a curve """
+    cls = NIST_CURVES[name]
+    params = cls()
+    curve = params.curve
+    g = params.generator
+    p2 = g + g
+    k = random.randrange(1, params.order)
+    x = random.randrange(1, curve.p)
+
+    def validated():
+        # Primes are memoized, the order must be tested again
+        primeCache().clear()
+        return ECDSAParams(curve, g, params.order)
+
+    yield ('params', lambda: cls(), 1)
+    yield ('params (validated)', validated, 1)
+    yield ('isPrime', lambda: isProbablePrime(params.order), 1)
+    yield ('isPrime (cached)', lambda: isPrime(params.order), 100)
+    yield ('invMod', lambda: invMod(x, curve.p), 100)
+    yield ('point add', lambda: g + p2, 20)
+    yield ('point double', lambda: p2 + p2, 20)
+    yield ('jacobian add', lambda: curve.jacobianAdd(
+        curve.toJacobian(g), curve.toJacobian(p2)), 100)
+    yield ('jacobian double', lambda: curve.jacobianDouble(
+        curve.toJacobian(p2)), 100)
+    yield ('scalar mul (ladder)', lambda: k * p2, 1)
+    yield ('scalar mul (wnaf)', lambda: p2.multiply(k, 'wnaf'), 1)
+    yield ('scalar mul (generator)', lambda: params.mulGenerator(k), 5)
+    yield ('genKeys', params.genKeys, 5)
+
+    for hash_name in hashes:
+        params = cls(HASHES[hash_name])
+        (public, private) = params.genKeys()
+        sig = private.sign(b'benchmark')
+        yield ('sign %s' % hash_name, lambda: private.sign(b'benchmark'), 5)
+        yield ('verify %s' % hash_name,
+               lambda: public.verify(sig, b'benchmark'), 2)
+
+def run(curves, hashes, iterations):
+    """ Run the benchmarks, return the results as a dict """
+    results = {}
+    for name in curves:
+        for (op, fct, cost) in curveBenchmarks(name, hashes):
+            stats = measure(fct, max(1, iterations * cost))
+            results['%s/%s' % (name, op)] = stats
+            print("%-5s %-24s %12.1f ops/s  p50 %10.1f us  p99 %10.1f us" % (
+                name, op, stats['ops_per_sec'], stats['p50_us'],
+                stats['p99_us']))
+    return results
+
+def compare(results, baseline, threshold):
+    """
+    Compare median latencies with the baseline.
+    Return the list of (benchmark, baseline p50, p50) slower by more than
+    threshold (a ratio).
+    """
+    regressions = []
+    for (key, stats) in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if stats['p50_us'] > base['p50_us'] * (1 + threshold):
+            regressions.append((key, base['p50_us'], stats['p50_us']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--curves', nargs='+', default=sorted(NIST_CURVES),
+                        choices=sorted(NIST_CURVES))
+    parser.add_argument('--hashes', nargs='+', default=sorted(HASHES),
+                        choices=sorted(HASHES))
+    parser.add_argument('--iterations', type=int, default=20,
+                        help='base number of iterations per operation')
+    parser.add_argument('--json', help='save the results in this file')
+    parser.add_argument('--baseline', help='compare with this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed slowdown of the median (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    results = run(args.curves, args.hashes, args.iterations)
+
+    if args.json:
+        with open(args.json, 'w') as fd:
+            json.dump({'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'results': results}, fd, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as fd:
+            baseline = json.load(fd)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for (key, before, after) in regressions:
+            print("REGRESSION %s : %.1f us -> %.1f us (%+.0f%%)" % (
+                key, before, after, (after / before - 1) * 100))
+        if regressions:
+            sys.exit(1)
+        print("No regression (threshold %d%%)" % (args.threshold * 100))
@@ -0,0 +1,46 @@
+"""
+Compare the field reduction backends with Python's % for the NIST primes,
+on random products of two field elements, and on a scalar multiplication.
+Run from the root of the repository : python bench/bench_field.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.ecc import ECC
+from ecdsa.field import PrimeField, SolinasField, MersenneField, NISTField
+
+
+def backends(p):
+    yield PrimeField(p)
+    yield SolinasField(p)
+    if p in (NISTField.P192, NISTField.P224, NISTField.P256, NISTField.P384):
+        yield NISTField(p)
+    if p & (p + 1) == 0:
+        yield MersenneField(p)
+
+
+if __name__ == '__main__':
+    for name in sorted(NIST_CURVES):
+        cls = NIST_CURVES[name]
+        p = cls.p
+        values = [random.randrange(p) * random.randrange(p)
+                  for _ in range(1000)]
+
+        base = timeit.timeit(lambda: [x % p for x in values], number=100)
+        print("%s  inline %%        : %.3f us/reduction" % (name, base * 10))
+
+        for field in backends(p):
+            reduce = field.reduce
+            t = timeit.timeit(lambda: [reduce(x) for x in values], number=100)
+            curve = ECC(cls.a, cls.b, p, field)
+            g = curve.newPoint(cls.gx, cls.gy)
+            k = random.randrange(cls.order)
+            t_mul = timeit.timeit(lambda: k * g, number=5) / 5
+            print("%s  %-14s : %.3f us/reduction, %.2f ms/scalar mul" % (
+                name, field.__class__.__name__, t * 10, t_mul * 1000))
@@ -0,0 +1,58 @@
+"""
+Microbenchmarks of the helpers of ecdsa/utils.py, compared with the
+implementations they replaced, for the sizes of the NIST curves.
+Run from the root of the repository : python bench/bench_utils.py
+"""
+
+import binascii
+import hashlib
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.utils import xgcd, hashDigest
+
+N = 200
+
+
+def invXgcd(a, n):
+    (g, u, v) = xgcd(a % n, n)
+    return u % n
+
+def invFermat(a, n):
+    return pow(a, n - 2, n)
+
+def hexToInt(data):
+    return int(binascii.hexlify(data), 16)
+
+def report(name, label, t):
+    print("%s  %-28s : %8.3f us" % (name, label, t * 1e6 / N))
+
+
+if __name__ == '__main__':
+    for name in sorted(NIST_CURVES):
+        cls = NIST_CURVES[name]
+        p = cls.p
+        values = [random.randrange(1, p) for _ in range(N)]
+        for (label, fct) in [("invMod (pow)", invMod),
+                             ("invMod (xgcd)", invXgcd),
+                             ("invMod (Fermat)", invFermat)]:
+            t = timeit.timeit(lambda: [fct(v, p) for v in values], number=10)
+            report(name, label, t / 10)
+
+        length = (p.bit_length() + 7) // 8
+        raw = [os.urandom(length) for _ in range(N)]
+        for (label, fct) in [("bytes to int (from_bytes)",
+                              lambda b: int.from_bytes(b, 'big')),
+                             ("bytes to int (hexlify)", hexToInt)]:
+            t = timeit.timeit(lambda: [fct(b) for b in raw], number=10)
+            report(name, label, t / 10)
+
+        digests = [hashlib.sha512(b).digest() for b in raw]
+        t = timeit.timeit(lambda: [hashDigest(d, cls.order) for d in digests],
+                          number=10)
+        report(name, "hashDigest (SHA-512)", t / 10)
@@ -1,2 +1,81 @@
-from .nistCurves import *
-from .ecdsaAlgo import *
+"""
+The submodules are imported on first access to one of their names, so
+importing the package is almost free.
+"""
+
+import importlib
+
+_LAZY = {
+    'ECC': 'ecc',
+    'ECCPoint': 'ecc',
+    'ECCInfinitePoint': 'ecc',
+    'ECCFixedBaseTable': 'ecc',
+    'ECCWindowTable': 'ecc',
+
+    'ECDSAParams': 'ecdsaAlgo',
+    'ECDSAPrivateKey': 'ecdsaAlgo',
+    'ECDSAPublicKey': 'ecdsaAlgo',
+    'ECDSASignature': 'ecdsaAlgo',
+    'verifyBatch': 'ecdsaAlgo',
+    'enablePublicKeyCache': 'ecdsaAlgo',
+    'disablePublicKeyCache': 'ecdsaAlgo',
+    'publicKeyCache': 'ecdsaAlgo',
+    'validationCache': 'ecdsaAlgo',
+    'setTableCacheDir': 'ecdsaAlgo',
+    'cachePublicKeyTable': 'ecdsaAlgo',
+    'hashlib': 'ecdsaAlgo',
+
+    'ECDSAParamsNIST': 'nistCurves',
+    'ECDSAParamsP192': 'nistCurves',
+    'ECDSAParamsP224': 'nistCurves',
+    'ECDSAParamsP256': 'nistCurves',
+    'ECDSAParamsP384': 'nistCurves',
+    'ECDSAParamsP521': 'nistCurves',
+    'NIST_CURVES': 'nistCurves',
+    'getParams': 'nistCurves',
+
+    'RFC6979': 'rfc6979',
+
+    'isProbablePrime': 'primality',
+    'verifyCertificate': 'primality',
+
+    'dumpTable': 'tables',
+    'parseTable': 'tables',
+    'saveTable': 'tables',
+    'loadTable': 'tables',
+
+    'LRUCache': 'utils',
+    'batchInvMod': 'utils',
+    'hashBytes': 'utils',
+    'hashDigest': 'utils',
+    'hashMessage': 'utils',
+    'hashStream': 'utils',
+    'invMod': 'utils',
+    'isPrime': 'utils',
+    'randomInteger': 'utils',
+    'randomIntegerUnbias': 'utils',
+    'sqrtMod': 'utils',
+    'wNAF': 'utils',
+    'xgcd': 'utils',
+}
+
+_SUBMODULES = ('aio', 'archive', 'ecc', 'ecdsaAlgo', 'encoding', 'field',
+               'instrument', 'nistCurves', 'parallel', 'pool', 'primality',
+               'rfc6979', 'tables', 'utils')
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__,
+                                                                 name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,143 @@
+"""
+asyncio front-end : signing and verification run in an executor, so they
+don't block the event loop.
+"""
+
+from .ecdsaAlgo import verifyBatch
+import asyncio
+
+
+def _signMany(requests):
+    """ Sign a list of (private key, message) """
+    return [private.sign(m) for (private, m) in requests]
+
+
+class AsyncECDSA:
+    """
+    Awaitable signing and verification.
+    Concurrent requests are coalesced in micro-batches : verifications are
+    checked with verifyBatch, and both kinds of requests need a single
+    executor call per batch. Requests wait in bounded queues, so callers
+    are slowed down (backpressure) when the executor can't keep up.
+    A cancelled request is dropped if its batch hasn't started yet. When a
+    batch fails, its requests are retried one by one, so a bad request
+    only fails its own caller.
+    Attributes:
+          executor: concurrent.futures executor (default: the loop's one).
+                    A ProcessPoolExecutor uses several cores.
+          maxBatch: maximal number of requests per batch
+          maxDelay: maximal time (in seconds) a request waits for others
+          maxQueue: maximal number of waiting requests of each kind
+    """
+    def __init__(self, executor=None, maxBatch=64, maxDelay=0.002,
+                 maxQueue=1024):
+        if maxBatch < 1:
+            raise Exception("Batch size must be positive !")
+
+        self.executor = executor
+        self.maxBatch = maxBatch
+        self.maxDelay = maxDelay
+        self.maxQueue = maxQueue
+        self.__queues = {}
+        self.__workers = []
+
+    def __queue(self, fct):
+        """ Queue of the requests processed by fct, started on first use """
+        queue = self.__queues.get(fct)
+        if queue is None:
+            queue = asyncio.Queue(self.maxQueue)
+            self.__queues[fct] = queue
+            worker = asyncio.get_running_loop().create_task(
+                self.__worker(queue, fct))
+            self.__workers.append(worker)
+        return queue
+
+    async def __submit(self, fct, request):
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue(fct).put((request, future))
+        return await future
+
+    async def __nextBatch(self, queue):
+        """ Wait for a request, then for others during maxDelay """
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.maxDelay
+        while len(batch) < self.maxBatch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return [(request, future) for (request, future) in batch
+                if not future.done()]
+
+    async def __run(self, fct, requests):
+        """
+        Results of a batch, with the exception of a request in place of its
+        result : when the batch fails, the requests are retried one by one,
+        so only the bad ones fail.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, fct, requests)
+        except Exception as e:
+            if len(requests) == 1:
+                return [e]
+        results = await asyncio.gather(
+            *[loop.run_in_executor(self.executor, fct, [request])
+              for request in requests], return_exceptions=True)
+        return [r if isinstance(r, BaseException) else r[0] for r in results]
+
+    async def __worker(self, queue, fct):
+        while True:
+            batch = await self.__nextBatch(queue)
+            if not batch:
+                continue
+            try:
+                results = await self.__run(
+                    fct, [request for (request, _) in batch])
+            except asyncio.CancelledError:
+                for (_, future) in batch:
+                    future.cancel()
+                raise
+            for ((_, future), result) in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, asyncio.CancelledError):
+                    future.cancel()
+                elif isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def averify(self, public, sign, m):
+        """ Verify an ECDSA signature """
+        return await self.__submit(verifyBatch, (public, sign, m))
+
+    async def asign(self, private, m):
+        """ Sign a message """
+        return await self.__submit(_signMany, (private, m))
+
+    async def close(self):
+        """ Stop the batching tasks, pending requests are cancelled """
+        for worker in self.__workers:
+            worker.cancel()
+        for worker in self.__workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        for queue in self.__queues.values():
+            while not queue.empty():
+                (_, future) = queue.get_nowait()
+                future.cancel()
+        self.__workers = []
+        self.__queues = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
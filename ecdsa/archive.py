@@ -0,0 +1,162 @@
+"""
+Verification of signature archives stored in memory-mapped files.
+"""
+
+from .ecdsaAlgo import ECDSASignature, verifyBatch
+from . import encoding
+import mmap
+import struct
+
+_HEADER = struct.Struct('>4sHHQ')
+_KEY_ID = struct.Struct('>I')
+_MESSAGE = struct.Struct('>QI')
+
+MAGIC = b'ECSA'
+VERSION = 1
+
+# Reasons of the failures
+INVALID_SIGNATURE = 'invalid signature'
+UNKNOWN_KEY = 'unknown key'
+BAD_RECORD = 'bad record'
+
+
+class SignatureArchive:
+    """
+    Fixed-width signature records in a memory-mapped file.
+    The records follow a header, big-endian :
+        magic 'ECSA' || version (2 bytes) || length of r and s (2 bytes) ||
+        record count (8 bytes)
+    A record is, big-endian :
+        key id (4 bytes) || r || s || message offset (8 bytes) ||
+        message length (4 bytes)
+    where r and s take params.byteLength bytes each, and the message
+    offset is relative to the start of the file.
+    The file is never read in memory, records and messages are
+    memoryview slices of the mapping.
+    Attributes:
+          params: the parameters of all the signatures
+          offset: position of the header
+          count: number of records (read from the header)
+    """
+    def __init__(self, path, params, offset=0):
+        self.params = params
+        self.offset = offset
+        self.recordSize = SignatureArchive.recordSizeFor(params)
+
+        with open(path, 'rb') as fd:
+            self.__mmap = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__view = memoryview(self.__mmap)
+
+        try:
+            if offset + _HEADER.size > len(self.__view):
+                raise Exception("Archive is too short !")
+            (magic, version, length, count) = _HEADER.unpack_from(
+                self.__view, offset)
+            if magic != MAGIC:
+                raise Exception("Invalid archive : bad magic !")
+            if version != VERSION:
+                raise Exception("Unsupported archive version %d !" % version)
+            if length != params.byteLength:
+                raise Exception("Archive is for other parameters !")
+            if self.__records() + count * self.recordSize > len(self.__view):
+                raise Exception("Archive is too short !")
+        except Exception:
+            self.close()
+            raise
+        self.count = count
+
+    def __records(self):
+        """ Position of the first record """
+        return self.offset + _HEADER.size
+
+    @staticmethod
+    def packHeader(params, count):
+        """ Encode the header of an archive of count records """
+        return _HEADER.pack(MAGIC, VERSION, params.byteLength, count)
+
+    @staticmethod
+    def recordSizeFor(params):
+        """ Size in bytes of a record """
+        return _KEY_ID.size + 2 * params.byteLength + _MESSAGE.size
+
+    @staticmethod
+    def packRecord(params, keyId, sign, msgOffset, msgLength):
+        """ Encode a record """
+        return (_KEY_ID.pack(keyId) + sign.toBytes() +
+                _MESSAGE.pack(msgOffset, msgLength))
+
+    def __len__(self):
+        return self.count
+
+    def record(self, i):
+        """ The record i, as (key id, signature, message memoryview) """
+        if not 0 <= i < self.count:
+            raise IndexError("Record index out of range")
+        view = self.__view
+        start = self.__records() + i * self.recordSize
+        length = self.params.byteLength
+
+        (keyId,) = _KEY_ID.unpack_from(view, start)
+        start += _KEY_ID.size
+        (r, s) = encoding.decodeSignatureRaw(
+            view[start:start + 2 * length], length)
+        (msgOffset, msgLength) = _MESSAGE.unpack_from(view, start + 2 * length)
+        if msgOffset + msgLength > len(view):
+            raise Exception("Record %d : message out of the archive !" % i)
+
+        sign = ECDSASignature(self.params, r, s)
+        return (keyId, sign, view[msgOffset:msgOffset + msgLength])
+
+    def failures(self, keys, batchSize=256):
+        """
+        Verify all the records, in batches, and yield (index, key id,
+        reason) for each failure, where reason is INVALID_SIGNATURE,
+        UNKNOWN_KEY (the key id isn't in keys, which maps key ids to
+        ECDSAPublicKey) or BAD_RECORD (the record can't be decoded, the key
+        id is then None).
+        """
+        for first in range(0, self.count, batchSize):
+            batch = []
+            failed = []
+            for i in range(first, min(first + batchSize, self.count)):
+                try:
+                    (keyId, sign, m) = self.record(i)
+                except Exception:
+                    failed.append((i, None, BAD_RECORD))
+                    continue
+                public = keys.get(keyId)
+                if public is None:
+                    m.release()
+                    failed.append((i, keyId, UNKNOWN_KEY))
+                    continue
+                batch.append((i, keyId, public, sign, m))
+
+            results = verifyBatch([(public, sign, m)
+                                   for (_, _, public, sign, m) in batch])
+            for ((i, keyId, _, _, m), ok) in zip(batch, results):
+                m.release()
+                if not ok:
+                    failed.append((i, keyId, INVALID_SIGNATURE))
+
+            for failure in sorted(failed):
+                yield failure
+
+    def close(self):
+        """
+        Unmap the file. Message views still held by the caller keep the
+        mapping alive until they are released.
+        """
+        if self.__mmap is None:
+            return
+        self.__view.release()
+        try:
+            self.__mmap.close()
+        except BufferError:
+            pass
+        self.__mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
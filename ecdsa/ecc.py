@@ -1,4 +1,8 @@
-from .utils import invMod
+from .utils import invMod, batchInvMod, wNAF, sqrtMod
+from . import encoding
+from .field import fieldFor
+from . import instrument
+import sys
 
 class ECCPoint:
     """
@@ -8,6 +12,8 @@ class ECCPoint:
          x : the x-coordinate of the point
          y : the y-coordinate of the point
     """
+    __slots__ = ('curve', 'x', 'y')
+
     def __init__(self, curve, x, y):
         if not isinstance(curve, ECC):
             raise Exception("First parameter must be type ECC")
@@ -19,8 +25,23 @@ class ECCPoint:
         if not self.isOnCurve():
             raise Exception("Point %s is not on the curve !" % self)
 
+    @classmethod
+    def _unchecked(cls, curve, x, y):
+        """
+        Create a point without checking it is on the curve.
+        Only used for the results of the point arithmetic, whose inputs
+        were already validated. Coordinates must be reduced mod p.
+        """
+        point = cls.__new__(cls)
+        point.curve = curve
+        point.x = x
+        point.y = y
+        return point
+
     def isOnCurve(self):
         """ Check if the point is on the curve """
+        if instrument.enabled:
+            instrument.count('point.isOnCurve')
         if self.isInfinity():
             return True
         v1 = pow(self.y, 2, self.curve.p)
@@ -35,8 +56,8 @@ class ECCPoint:
     def copy(self):
         """ Create a copy of the current point """
         if self.isInfinity():
-            return ECCInfinitePoint(self.curve)
-        return ECCPoint(self.curve, self.x, self.y)
+            return self.curve.infinity
+        return ECCPoint._unchecked(self.curve, self.x, self.y)
 
     def __add__(self, other):
         """ Point addition : P1 + P2 """
@@ -48,16 +69,19 @@ class ECCPoint:
             return other.copy()
         if other.isInfinity():
             return self.copy()
-        if self == -other:
-            return ECCInfinitePoint(self.curve)
-
         curve = self.curve
         (a, b, p) = (curve.a, curve.b, curve.p)
         (x1, y1) = (self.x, self.y)
         (x2, y2) = (other.x, other.y)
 
+        if x1 == x2 and (y1 + y2) % p == 0:
+            return curve.infinity
+
+        if instrument.enabled:
+            instrument.count('point.double' if x1 == x2 else 'point.add')
+
         # General case
-        if self == other:
+        if x1 == x2:
             l = ((3*pow(x1, 2, p) + a) * invMod(2*y1, p)) % p
         else:
             l = ((y2 - y1) * invMod(x2 - x1, p)) % p
@@ -65,25 +89,94 @@ class ECCPoint:
         x = (l**2 - x1 - x2) % p
         y = (l * (x1 - x) - y1) % p
 
-        return ECCPoint(curve, x, y)
+        return ECCPoint._unchecked(curve, x, y)
 
     def __mul__(self, k):
         """
         Multiplication of a point : [k]P
         The Montgomery ladder is used to prevent timing attacks.
+        Intermediate points are kept in Jacobian coordinates, so only one
+        modular inversion is done, when converting the result back.
+        The order of a point isn't known, so the ladder runs over the size
+        of p plus one bits : ECDSAParams.multiply uses the order instead.
+        """
+        return self.multiply(k)
+
+    def multiply(self, k, method='ladder', bits=None):
         """
-        r0 = ECCInfinitePoint(self.curve)
-        r1 = self.copy()
+        Multiplication of a point : [k]P, with the given method :
+          'ladder': Montgomery ladder, for secret scalars
+          'window': fixed window, for secret scalars. Faster than the
+                    ladder, one addition is done per window whatever the
+                    digit is.
+          'wnaf': width-w NAF, the fastest, for public scalars only
+        The secret scalar methods run over bits bits, which should be the
+        bit length of the group order (default: the size of p, plus one).
+        """
+        curve = self.curve
+        if bits is None:
+            bits = curve.p.bit_length() + 1
+        if k < 0:
+            return (-self).multiply(-k, method, bits)
+
+        if method == 'ladder':
+            jp = self.__ladderJacobian(k, bits)
+        elif method == 'window':
+            jp = self.__windowJacobian(k, bits)
+        elif method == 'wnaf':
+            jp = curve.multiScalarMulJacobian([(k, self)])
+        else:
+            raise Exception("Unknown multiplication method %s !" % method)
+        return curve.fromJacobian(jp)
+
+    def __ladderJacobian(self, k, bits):
+        """ Montgomery ladder over bits bits, in Jacobian coordinates """
+        if k.bit_length() > bits:
+            raise Exception("Scalar is larger than %d bits !" % bits)
+        curve = self.curve
+        r0 = ECC.JACOBIAN_INFINITY
+        r1 = curve.toJacobian(self)
 
-        for i in range(self.curve.p.bit_length(), -1, -1):
+        for i in range(bits - 1, -1, -1):
             if (k & (1 << i)) == 0:
-                r1 += r0
-                r0 += r0
+                r1 = curve.jacobianAdd(r0, r1)
+                r0 = curve.jacobianDouble(r0)
             else:
-                r0 += r1
-                r1 += r1
+                r0 = curve.jacobianAdd(r0, r1)
+                r1 = curve.jacobianDouble(r1)
         return r0
 
+    def __windowJacobian(self, k, bits, width=4):
+        """
+        Fixed window method over bits bits, in Jacobian coordinates :
+        width doublings and one addition per window (a dummy one for a
+        zero digit)
+        """
+        if k.bit_length() > bits:
+            raise Exception("Scalar is larger than %d bits !" % bits)
+        curve = self.curve
+        p1 = curve.toJacobian(self)
+        table = [ECC.JACOBIAN_INFINITY, p1]
+        for _ in range(2, 1 << width):
+            table.append(curve.jacobianAdd(table[-1], p1))
+
+        mask = (1 << width) - 1
+        r = ECC.JACOBIAN_INFINITY
+        dummy = ECC.JACOBIAN_INFINITY
+        for i in range((bits + width - 1) // width - 1, -1, -1):
+            for _ in range(width):
+                r = curve.jacobianDouble(r)
+            digit = (k >> (i * width)) & mask
+            if digit:
+                r = curve.jacobianAdd(r, table[digit])
+            else:
+                dummy = curve._dummyAdd(dummy, p1)
+        return r
+
+    def encode(self, compressed=False):
+        """ SEC1 encoding of the point """
+        return encoding.encodePoint(self, compressed)
+
     def __rmul__(self, k):
         """ Multiplication is commutative : kP = Pk """
         return self * k
@@ -105,8 +198,8 @@ class ECCPoint:
     def __neg__(self):
         """ Inverse of a point : -(x, y) = (x, -y) """
         if self.isInfinity():
-            return ECCInfinitePoint(self.curve)
-        return ECCPoint(self.curve, self.x, (-self.y) % self.curve.p)
+            return self.curve.infinity
+        return ECCPoint._unchecked(self.curve, self.x, (-self.y) % self.curve.p)
 
     def __repr__(self):
         """ String representation of a point """
@@ -117,8 +210,11 @@ class ECCPoint:
 
 class ECCInfinitePoint(ECCPoint):
     """
-    Special point at infinite (neutral element of addition law)
+    Special point at infinite (neutral element of addition law).
+    It's immutable, and each curve has a shared instance (ECC.infinity).
     """
+    __slots__ = ()
+
     def __init__(self, curve):
         self.curve = curve
 
@@ -126,6 +222,174 @@ class ECCInfinitePoint(ECCPoint):
         """ It's Infinite point """
         return True
 
+class ECCFixedBaseTable:
+    """
+    Precomputed multiples of a fixed point P, to compute [k]P quickly.
+    The scalar is split in windows of `width` bits. For the window i, the
+    table holds [j * 2^(width*i)]P for 1 <= j < 2^width (affine
+    coordinates), so [k]P is a sum of one table entry per window, without
+    any doubling.
+    Attributes:
+         point: the base point P
+         bits: maximal bit length of the scalars
+         width: window width, a larger width uses more memory but less
+                additions
+         rows: the table, rows[i][j-1] = [j * 2^(width*i)]P as (x, y)
+    """
+    def __init__(self, point, bits, width=4, rows=None):
+        if point.isInfinity():
+            raise Exception("Can't build a table for the infinite point !")
+        if width < 1:
+            raise Exception("Table width must be positive !")
+
+        self.point = point
+        self.bits = bits
+        self.width = width
+
+        if rows is not None:
+            self.rows = rows
+            return
+
+        curve = point.curve
+        base = curve.toJacobian(point)
+        self.rows = []
+        for _ in range((bits + width - 1) // width):
+            row = [base]
+            for _ in range(2, 1 << width):
+                row.append(curve.jacobianAdd(row[-1], base))
+            self.rows.append(curve.batchToAffine(row))
+            base = curve.jacobianAdd(row[-1], base)
+
+    def mulJacobian(self, k, constantTime=True):
+        """
+        [k]P in Jacobian coordinates.
+        In constant time mode, one addition is done per window even for a
+        zero digit, so the amount of work doesn't depend on the value of k.
+        It can be disabled when k is public.
+        """
+        if k < 0 or k.bit_length() > self.bits:
+            raise Exception("Scalar out of the table range !")
+
+        curve = self.point.curve
+        mask = (1 << self.width) - 1
+        acc = ECC.JACOBIAN_INFINITY
+        dummy = ECC.JACOBIAN_INFINITY
+        for (i, row) in enumerate(self.rows):
+            digit = (k >> (i * self.width)) & mask
+            if digit:
+                acc = curve.jacobianAddAffine(acc, row[digit - 1])
+            elif constantTime:
+                dummy = curve._dummyAddAffine(dummy, row[0])
+        return acc
+
+    def mul(self, k):
+        """ [k]P """
+        return self.point.curve.fromJacobian(self.mulJacobian(k))
+
+    def check(self):
+        """
+        Check the entries (e.g of a table loaded from a file) : each entry
+        is on the curve, and is the previous entry plus the first entry of
+        its row, the first entry of a row being the last entry of the
+        previous row plus its first entry.
+        """
+        curve = self.point.curve
+        per_row = (1 << self.width) - 1
+        if len(self.rows) != (self.bits + self.width - 1) // self.width:
+            return False
+
+        previous = None
+        for row in self.rows:
+            if len(row) != per_row:
+                return False
+            entries = [row[j] for j in range(per_row)]
+            for entry in entries:
+                if entry is None or not curve.containsAffine(entry):
+                    return False
+            first = entries[0]
+            if previous is None:
+                if first != (self.point.x, self.point.y):
+                    return False
+            elif not curve.isAffineSum(previous[-1], previous[0], first):
+                return False
+            for j in range(1, per_row):
+                if not curve.isAffineSum(entries[j - 1], first, entries[j]):
+                    return False
+            previous = entries
+        return True
+
+class ECCWindowTable:
+    """
+    Odd multiples P, 3P, 5P, ..., (2^(width-1) - 1)P of a point, in affine
+    coordinates, used with the width-w NAF of the scalars.
+    Attributes:
+         point: the point P
+         width: the wNAF width
+         odd: the table, odd[i] = [2i + 1]P as (x, y)
+    """
+    def __init__(self, point, width=5, odd=None):
+        if point.isInfinity():
+            raise Exception("Can't build a table for the infinite point !")
+        if width < 2:
+            raise Exception("wNAF width must be at least 2 !")
+
+        self.point = point
+        self.width = width
+
+        if odd is not None:
+            self.odd = odd
+            return
+
+        curve = point.curve
+        p1 = curve.toJacobian(point)
+        p2 = curve.jacobianDouble(p1)
+        odd = [p1]
+        for _ in range(1, 1 << (width - 2)):
+            odd.append(curve.jacobianAdd(odd[-1], p2))
+        self.odd = curve.batchToAffine(odd)
+
+    def check(self):
+        """
+        Check the entries (e.g of a table loaded from a file) : each entry
+        is on the curve, the first one is P and each next one is the
+        previous one plus 2P.
+        """
+        point = self.point
+        curve = point.curve
+        count = 1 << (self.width - 2)
+        if len(self.odd) != count:
+            return False
+        entries = [self.odd[i] for i in range(count)]
+        for entry in entries:
+            if entry is None or not curve.containsAffine(entry):
+                return False
+        if entries[0] != (point.x, point.y):
+            return False
+
+        double = point + point
+        if double.isInfinity():
+            return count == 1
+        double = (double.x, double.y)
+        for i in range(1, count):
+            if not curve.isAffineSum(entries[i - 1], double, entries[i]):
+                return False
+        return True
+
+    def sizeInBytes(self):
+        """ Approximate memory used by the table """
+        size = sys.getsizeof(self.odd)
+        for (x, y) in self.odd:
+            size += sys.getsizeof((x, y)) + sys.getsizeof(x) + sys.getsizeof(y)
+        return size
+
+    def mulJacobian(self, k):
+        """ [k]P in Jacobian coordinates (k is public) """
+        return self.point.curve.multiScalarMulJacobian([(k, self)])
+
+    def mul(self, k):
+        """ [k]P """
+        return self.point.curve.fromJacobian(self.mulJacobian(k))
+
 class ECC:
     """
     Representation of an elliptic curve over finite field.
@@ -134,9 +398,18 @@ class ECC:
          a: constant A of the elliptic curve
          b: constant B of the elliptic curve
          p: modulus defining the finite field Fp
+         field: reduction backend for Fp (chosen with fieldFor by default)
 
+    Points can also be handled internally as (X, Y, Z) tuples in Jacobian
+    coordinates, where (x, y) = (X/Z^2, Y/Z^3) and Z = 0 is the point at
+    infinity. This avoids a modular inversion for each addition.
     """
-    def __init__(self, a, b, p):
+    JACOBIAN_INFINITY = (1, 1, 0)
+
+    __slots__ = ('a', 'b', 'p', 'field', 'fastReduce', 'aIsMinus3',
+                 'infinity')
+
+    def __init__(self, a, b, p, field=None):
         self.a = a
         self.b = b
         self.p = p
@@ -144,14 +417,380 @@ class ECC:
         if self.isSingular():
             raise Exception("Curve %s is singular !" % self)
 
+        if field is None:
+            field = fieldFor(p)
+        if field.p != p:
+            raise Exception("Field %s doesn't match the curve !" % field)
+        self.field = field
+        # None when the inline % of the generic formulas is the fastest
+        self.fastReduce = None if field.generic else field.reduce
+
+        # a = -3 (NIST curves) allows a cheaper doubling formula
+        self.aIsMinus3 = (a % p) == p - 3
+
+        self.infinity = ECCInfinitePoint(self)
 
     def newPoint(self, x, y):
         """ Create a new EC point (x, y) """
         return ECCPoint(self, x, y)
 
     def newInfinitePoint(self):
-        """ Create a new infinite point """
-        return ECCInfinitePoint(self)
+        """ The infinite point (shared by all the users of the curve) """
+        return self.infinity
+
+    @property
+    def byteLength(self):
+        """ Length in bytes of an element of Fp """
+        return (self.p.bit_length() + 7) // 8
+
+    def yFromX(self, x, parity):
+        """ The y coordinate of the point (x, y) with the given parity """
+        p = self.p
+        y = sqrtMod(pow(x, 3, p) + self.a * x + self.b, p)
+        if y is None:
+            raise Exception("No point with x = %d on the curve !" % x)
+        if y & 1 != parity:
+            y = (p - y) % p
+        return y
+
+    def decodePoint(self, data):
+        """ Decode a SEC1 encoded point (bytes or memoryview) """
+        return encoding.decodePoint(self, data)
+
+    def containsAffine(self, q):
+        """ Check if the affine (x, y) tuple is a point of the curve """
+        (x, y) = q
+        p = self.p
+        if not (0 <= x < p and 0 <= y < p):
+            return False
+        return (y * y - (x * x + self.a) * x - self.b) % p == 0
+
+    def isAffineSum(self, q1, q2, r):
+        """
+        Check r = q1 + q2 for affine (x, y) tuples on the curve, without
+        inversion : -r must be the third point of the curve on the line
+        through q1 and q2 (the tangent when q1 = q2). The degenerate cases
+        where r has the x coordinate of q1 or q2 are rejected.
+        """
+        p = self.p
+        ((x1, y1), (x2, y2), (x3, y3)) = (q1, q2, r)
+        if x3 == x1 or x3 == x2:
+            return False
+        if x1 == x2:
+            if y1 != y2 or y1 == 0:
+                return False
+            # Tangent : slope (3x^2 + a) / 2y
+            return ((3 * x1 * x1 + self.a) * (x3 - x1) -
+                    (-y3 - y1) * 2 * y1) % p == 0
+        return ((y2 - y1) * (x3 - x1) - (-y3 - y1) * (x2 - x1)) % p == 0
+
+    def toJacobian(self, point):
+        """ Convert an affine point to Jacobian coordinates (X, Y, Z) """
+        if point.isInfinity():
+            return ECC.JACOBIAN_INFINITY
+        return (point.x, point.y, 1)
+
+    def fromJacobian(self, jp):
+        """
+        Convert a point (X, Y, Z) in Jacobian coordinates back to affine
+        coordinates : (x, y) = (X/Z^2, Y/Z^3)
+        """
+        (X, Y, Z) = jp
+        if Z == 0:
+            return self.infinity
+        p = self.p
+        z_inv = invMod(Z, p)
+        z_inv2 = (z_inv * z_inv) % p
+        x = (X * z_inv2) % p
+        y = (Y * z_inv2 * z_inv) % p
+        return ECCPoint._unchecked(self, x, y)
+
+    def batchToAffine(self, jps):
+        """
+        Convert a list of Jacobian points to affine (x, y) tuples with a
+        single modular inversion (None for the point at infinity)
+        """
+        p = self.p
+        z_invs = iter(batchInvMod([Z for (_, _, Z) in jps if Z != 0], p))
+        result = []
+        for (X, Y, Z) in jps:
+            if Z == 0:
+                result.append(None)
+                continue
+            z_inv = next(z_invs)
+            z_inv2 = (z_inv * z_inv) % p
+            result.append(((X * z_inv2) % p, (Y * z_inv2 * z_inv) % p))
+        return result
+
+    # The public operations count what they really compute (nothing for
+    # the point at infinity), then use the formulas of the field backend.
+
+    def jacobianDouble(self, jp):
+        """ Point doubling in Jacobian coordinates : 2P """
+        if instrument.enabled and jp[2] != 0 and jp[1] != 0:
+            instrument.count('point.double')
+        if self.fastReduce is not None:
+            return self._jacobianDoubleReduce(jp)
+        return self._jacobianDoubleMod(jp)
+
+    def jacobianAddAffine(self, jp, q):
+        """
+        Mixed addition : P + Q, where P is in Jacobian coordinates and Q is
+        an affine (x, y) tuple, or None for the point at infinity
+        """
+        if q is None:
+            return jp
+        if instrument.enabled:
+            self._countAdd(jp, (q[0], q[1], 1))
+        if self.fastReduce is not None:
+            return self._jacobianAddAffineReduce(jp, q)
+        return self._jacobianAddAffineMod(jp, q)
+
+    def jacobianAdd(self, jp1, jp2):
+        """ Point addition in Jacobian coordinates : P1 + P2 """
+        if instrument.enabled:
+            self._countAdd(jp1, jp2)
+        if self.fastReduce is not None:
+            return self._jacobianAddReduce(jp1, jp2)
+        return self._jacobianAddMod(jp1, jp2)
+
+    def _dummyAdd(self, jp1, jp2):
+        """
+        Addition only done to make the time independent of a secret (its
+        result is unused), counted as point.dummyAdd
+        """
+        if instrument.enabled:
+            instrument.count('point.dummyAdd')
+        if self.fastReduce is not None:
+            return self._jacobianAddReduce(jp1, jp2)
+        return self._jacobianAddMod(jp1, jp2)
+
+    def _dummyAddAffine(self, jp, q):
+        """ Mixed version of _dummyAdd """
+        if instrument.enabled:
+            instrument.count('point.dummyAdd')
+        if self.fastReduce is not None:
+            return self._jacobianAddAffineReduce(jp, q)
+        return self._jacobianAddAffineMod(jp, q)
+
+    def _countAdd(self, jp1, jp2):
+        """
+        Count an addition as the operation it computes : an addition, a
+        doubling (P1 = P2), or nothing (an infinite operand, or P1 = -P2)
+        """
+        (X1, Y1, Z1) = jp1
+        (X2, Y2, Z2) = jp2
+        if Z1 == 0 or Z2 == 0:
+            return
+        p = self.p
+        Z1Z1 = (Z1 * Z1) % p
+        Z2Z2 = (Z2 * Z2) % p
+        if (X1 * Z2Z2 - X2 * Z1Z1) % p != 0:
+            instrument.count('point.add')
+        elif (Y1 * Z2 * Z2Z2 - Y2 * Z1 * Z1Z1) % p == 0 and Y1 != 0:
+            instrument.count('point.double')
+
+    # Formulas with the % operator (generic field backend)
+
+    def _jacobianDoubleMod(self, jp):
+        (X, Y, Z) = jp
+        if Z == 0 or Y == 0:
+            return ECC.JACOBIAN_INFINITY
+        p = self.p
+
+        YY = (Y * Y) % p
+        ZZ = (Z * Z) % p
+        if self.aIsMinus3:
+            # 3X^2 + aZ^4 = 3(X - Z^2)(X + Z^2) when a = -3
+            M = (3 * (X - ZZ) * (X + ZZ)) % p
+        else:
+            M = (3 * X * X + self.a * ZZ * ZZ) % p
+        S = (4 * X * YY) % p
+
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        Z3 = (2 * Y * Z) % p
+        return (X3, Y3, Z3)
+
+    def _jacobianAddAffineMod(self, jp, q):
+        (X1, Y1, Z1) = jp
+        (x2, y2) = q
+        if Z1 == 0:
+            return (x2, y2, 1)
+        p = self.p
+
+        Z1Z1 = (Z1 * Z1) % p
+        U2 = (x2 * Z1Z1) % p
+        S2 = (y2 * Z1 * Z1Z1) % p
+
+        if X1 == U2:
+            if Y1 != S2:
+                return ECC.JACOBIAN_INFINITY
+            return self._jacobianDoubleMod(jp)
+
+        H = (U2 - X1) % p
+        R = (S2 - Y1) % p
+        HH = (H * H) % p
+        HHH = (H * HH) % p
+        V = (X1 * HH) % p
+
+        X3 = (R * R - HHH - 2 * V) % p
+        Y3 = (R * (V - X3) - Y1 * HHH) % p
+        Z3 = (Z1 * H) % p
+        return (X3, Y3, Z3)
+
+    def _jacobianAddMod(self, jp1, jp2):
+        (X1, Y1, Z1) = jp1
+        (X2, Y2, Z2) = jp2
+        if Z1 == 0:
+            return jp2
+        if Z2 == 0:
+            return jp1
+        p = self.p
+
+        Z1Z1 = (Z1 * Z1) % p
+        Z2Z2 = (Z2 * Z2) % p
+        U1 = (X1 * Z2Z2) % p
+        U2 = (X2 * Z1Z1) % p
+        S1 = (Y1 * Z2 * Z2Z2) % p
+        S2 = (Y2 * Z1 * Z1Z1) % p
+
+        if U1 == U2:
+            if S1 != S2:
+                return ECC.JACOBIAN_INFINITY
+            return self._jacobianDoubleMod(jp1)
+
+        H = (U2 - U1) % p
+        R = (S2 - S1) % p
+        HH = (H * H) % p
+        HHH = (H * HH) % p
+        V = (U1 * HH) % p
+
+        X3 = (R * R - HHH - 2 * V) % p
+        Y3 = (R * (V - X3) - S1 * HHH) % p
+        Z3 = (H * Z1 * Z2) % p
+        return (X3, Y3, Z3)
+
+    # Same formulas as above, with the reduction of the field backend
+
+    def _jacobianDoubleReduce(self, jp):
+        (X, Y, Z) = jp
+        if Z == 0 or Y == 0:
+            return ECC.JACOBIAN_INFINITY
+        red = self.fastReduce
+
+        YY = red(Y * Y)
+        ZZ = red(Z * Z)
+        if self.aIsMinus3:
+            M = red(3 * red((X - ZZ) * (X + ZZ)))
+        else:
+            M = red(3 * X * X + self.a * red(ZZ * ZZ))
+        S = red(4 * X * YY)
+
+        X3 = red(M * M - 2 * S)
+        Y3 = red(M * (S - X3) - 8 * red(YY * YY))
+        Z3 = red(2 * Y * Z)
+        return (X3, Y3, Z3)
+
+    def _jacobianAddAffineReduce(self, jp, q):
+        (X1, Y1, Z1) = jp
+        (x2, y2) = q
+        if Z1 == 0:
+            return (x2, y2, 1)
+        red = self.fastReduce
+
+        Z1Z1 = red(Z1 * Z1)
+        U2 = red(x2 * Z1Z1)
+        S2 = red(red(y2 * Z1) * Z1Z1)
+
+        if X1 == U2:
+            if Y1 != S2:
+                return ECC.JACOBIAN_INFINITY
+            return self._jacobianDoubleReduce(jp)
+
+        H = red(U2 - X1)
+        R = red(S2 - Y1)
+        HH = red(H * H)
+        HHH = red(H * HH)
+        V = red(X1 * HH)
+
+        X3 = red(R * R - HHH - 2 * V)
+        Y3 = red(R * (V - X3) - Y1 * HHH)
+        Z3 = red(Z1 * H)
+        return (X3, Y3, Z3)
+
+    def _jacobianAddReduce(self, jp1, jp2):
+        (X1, Y1, Z1) = jp1
+        (X2, Y2, Z2) = jp2
+        if Z1 == 0:
+            return jp2
+        if Z2 == 0:
+            return jp1
+        red = self.fastReduce
+
+        Z1Z1 = red(Z1 * Z1)
+        Z2Z2 = red(Z2 * Z2)
+        U1 = red(X1 * Z2Z2)
+        U2 = red(X2 * Z1Z1)
+        S1 = red(red(Y1 * Z2) * Z2Z2)
+        S2 = red(red(Y2 * Z1) * Z1Z1)
+
+        if U1 == U2:
+            if S1 != S2:
+                return ECC.JACOBIAN_INFINITY
+            return self._jacobianDoubleReduce(jp1)
+
+        H = red(U2 - U1)
+        R = red(S2 - S1)
+        HH = red(H * H)
+        HHH = red(H * HH)
+        V = red(U1 * HH)
+
+        X3 = red(R * R - HHH - 2 * V)
+        Y3 = red(R * (V - X3) - S1 * HHH)
+        Z3 = red(red(H * Z1) * Z2)
+        return (X3, Y3, Z3)
+
+    def multiScalarMulJacobian(self, terms):
+        """
+        Compute [k1]P1 + [k2]P2 + ... in Jacobian coordinates, for public
+        scalars. terms is a list of (k, P) where P is an ECCPoint, an
+        ECCWindowTable or an ECCFixedBaseTable.
+        Fixed-base tables are used directly, the other points share their
+        doublings with Straus' interleaved wNAF method (Shamir's trick).
+        """
+        p = self.p
+        acc = ECC.JACOBIAN_INFINITY
+        interleaved = []
+        for (k, P) in terms:
+            if isinstance(P, ECCFixedBaseTable):
+                acc = self.jacobianAdd(acc, P.mulJacobian(k, False))
+                continue
+            if not isinstance(P, ECCWindowTable):
+                if P.isInfinity():
+                    continue
+                P = ECCWindowTable(P)
+            interleaved.append((wNAF(k, P.width), P.odd))
+
+        length = max([len(naf) for (naf, _) in interleaved] + [0])
+        r = ECC.JACOBIAN_INFINITY
+        for i in range(length - 1, -1, -1):
+            r = self.jacobianDouble(r)
+            for (naf, odd) in interleaved:
+                if i >= len(naf):
+                    continue
+                d = naf[i]
+                if d > 0:
+                    r = self.jacobianAddAffine(r, odd[d >> 1])
+                elif d < 0:
+                    q = odd[(-d) >> 1]
+                    if q is not None:
+                        r = self.jacobianAddAffine(r, (q[0], p - q[1]))
+        return self.jacobianAdd(acc, r)
+
+    def multiScalarMul(self, terms):
+        """ [k1]P1 + [k2]P2 + ... (see multiScalarMulJacobian) """
+        return self.fromJacobian(self.multiScalarMulJacobian(terms))
 
     def determinant(self):
         """ Determinant of the curve """
@@ -165,6 +804,9 @@ class ECC:
         """ String representation of the curve """
         return "Y^2 = X^3 + %dX + %d [mod %d]" % (self.a, self.b, self.p)
 
+    def __hash__(self):
+        return hash((self.a, self.b, self.p))
+
     def __eq__(self, other):
         """ Test if two curves are equals """
         return (self.a, self.b, self.p) == (other.a, other.b, other.p)
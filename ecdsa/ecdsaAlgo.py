@@ -1,6 +1,111 @@
-from .ecc import ECC, ECCPoint, ECCInfinitePoint
+from .ecc import ECC, ECCPoint, ECCInfinitePoint, ECCFixedBaseTable, \
+    ECCWindowTable
 from .utils import *
+from .rfc6979 import RFC6979
+from . import encoding
+from . import instrument
 import hashlib
+import itertools
+import os
+
+# Generator tables, shared by all the parameters using the same generator
+_GENERATOR_TABLES = {}
+
+# Directory where generator tables are saved and loaded from, if any
+_TABLE_CACHE_DIR = os.environ.get('ECDSA_TABLE_CACHE')
+
+def setTableCacheDir(path):
+    """
+    Save the generator tables in the directory path, and load them from it
+    instead of computing them again (None to disable). The environment
+    variable ECDSA_TABLE_CACHE sets the initial directory. The entries of
+    a loaded table are checked (see tables.parseTable), a table failing
+    the checks is computed again.
+    """
+    global _TABLE_CACHE_DIR
+    _TABLE_CACHE_DIR = path
+
+def _tableCachePath(curve, g, bits, width):
+    """ File of the generator table in the cache directory """
+    key = "%d %d %d %d %d %d %d" % (curve.a, curve.b, curve.p, g.x, g.y,
+                                    bits, width)
+    name = hashlib.sha256(key.encode()).hexdigest()[:32]
+    return os.path.join(_TABLE_CACHE_DIR, "g-%s.tbl" % name)
+
+def _loadTable(g, bits, width):
+    """ Generator table, from the cache directory when possible """
+    if _TABLE_CACHE_DIR is None:
+        return ECCFixedBaseTable(g, bits, width)
+
+    from . import tables
+    path = _tableCachePath(g.curve, g, bits, width)
+    try:
+        table = tables.loadTable(path, g.curve)
+        if (table.point == g and table.bits == bits and
+                table.width == width):
+            return table
+    except Exception:
+        pass
+
+    table = ECCFixedBaseTable(g, bits, width)
+    try:
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        tables.saveTable(table, tmp)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return table
+
+# Optional cache of public key tables (see enablePublicKeyCache)
+_PUBLIC_KEY_CACHE = None
+_PUBLIC_KEY_WIDTH = 6
+
+def enablePublicKeyCache(maxEntries=1024, maxBytes=None, width=6):
+    """
+    Cache the window tables of the public points used for verification,
+    in a LRU cache keyed by (curve, x, y). Useful when the same keys verify
+    many signatures. Return the cache, which exposes hit/miss counters.
+    """
+    global _PUBLIC_KEY_CACHE, _PUBLIC_KEY_WIDTH
+    _PUBLIC_KEY_CACHE = LRUCache(maxEntries, maxBytes,
+                                 lambda table: table.sizeInBytes())
+    _PUBLIC_KEY_WIDTH = width
+    return _PUBLIC_KEY_CACHE
+
+def cachePublicKeyTable(table):
+    """
+    Insert a window table (e.g loaded with tables.loadTable) in the public
+    key cache, which must be enabled. The entries are checked first, as
+    verify uses them as multiples of the public point.
+    """
+    if _PUBLIC_KEY_CACHE is None:
+        raise Exception("Public key cache is disabled !")
+    if not isinstance(table, ECCWindowTable) or not table.check():
+        raise Exception("Invalid public key table !")
+    p = table.point
+    _PUBLIC_KEY_CACHE.put((p.curve, p.x, p.y), table)
+
+def disablePublicKeyCache():
+    """ Stop caching public key tables """
+    global _PUBLIC_KEY_CACHE
+    _PUBLIC_KEY_CACHE = None
+
+def publicKeyCache():
+    """ The public key table cache, or None if it's disabled """
+    return _PUBLIC_KEY_CACHE
+
+# Public points which passed the full validation, keyed by
+# (curve, SEC1 encoding)
+_VALIDATION_CACHE = LRUCache(4096)
+
+def _validationKey(params, data):
+    """ Key of an encoded point in the validation cache """
+    g = params.generator
+    return (params.curve, g.x, g.y, params.order, params.cofactor, data)
+
+def validationCache():
+    """ The cache of validated public keys (a LRUCache) """
+    return _VALIDATION_CACHE
 
 class ECDSAPrivateKey:
     """
@@ -8,8 +113,12 @@ class ECDSAPrivateKey:
     Attributes:
           params: public parameters (curve, order, generator...)
           d: the private multiplier
+          deterministic: if True, nonces are derived from the key and the
+                         message (RFC 6979) instead of being random
     """
-    def __init__(self, params, d):
+    __slots__ = ('__params', '__d', '__rfc6979', 'deterministic')
+
+    def __init__(self, params, d, deterministic=False):
         assert isinstance(params, ECDSAParams)
 
         if d <= 0 or d >= params.order:
@@ -17,31 +126,96 @@ class ECDSAPrivateKey:
 
         self.__params = params
         self.__d = d
+        self.__rfc6979 = None
+        self.deterministic = deterministic
+
+    def __getstate__(self):
+        """ The RFC 6979 state holds an HMAC object, it isn't pickled """
+        return (self.__params, self.__d, self.deterministic)
+
+    def __setstate__(self, state):
+        (self.__params, self.__d, self.deterministic) = state
+        self.__rfc6979 = None
 
     @property
     def params(self):
         return self.__params
 
-    def sign(self, m, k=None):
-        """ Sign a message using ECDSA algorithm """
-        hash_fct = self.params.hashFunc
+    def toBytes(self):
+        """ The private multiplier d, big-endian on the order's length """
+        return encoding.intToBytes(self.__d, self.params.byteLength)
+
+    @classmethod
+    def fromBytes(cls, params, data, deterministic=False):
+        """ Private key from its toBytes() encoding """
+        if len(data) != params.byteLength:
+            raise Exception("Invalid private key length !")
+        return cls(params, encoding.bytesToInt(data), deterministic)
+
+    def __nonces(self, h, k, deterministic):
+        """ Candidates for the nonce, as (k, k^-1 mod n, r) tuples """
+        params = self.params
+        if k is not None:
+            ks = [k]
+        elif deterministic:
+            if self.__rfc6979 is None:
+                self.__rfc6979 = RFC6979(self.__d, params.order,
+                                         params.hashFunc)
+            ks = self.__rfc6979.nonces(h)
+        elif params.noncePool is not None:
+            pool = params.noncePool
+            return (pool.pop() for _ in itertools.count())
+        else:
+            ks = (randomIntegerUnbias(params.order) for _ in itertools.count())
+        return (self.__nonce(k) for k in ks)
+
+    def __nonce(self, k):
         order = self.params.order
-        generator = self.params.generator
-
-        (x, y) = (0, 0)
+        r = self.params.mulGenerator(k).x % order
+        return (k, invMod(k, order) if r != 0 else None, r)
+
+    def sign(self, m, k=None, deterministic=None):
+        """
+        Sign a message using ECDSA algorithm.
+        The nonce k is random, unless it's given or deterministic is True
+        (by default, the deterministic attribute of the key is used).
+        Random nonces are taken from params.noncePool when it's set.
+        """
+        return self.signDigest(hashBytes(self.params.hashFunc, m), k,
+                               deterministic)
+
+    def signStream(self, stream, k=None, deterministic=None):
+        """
+        Sign a message read from a file object or an iterable of chunks,
+        without loading it in memory
+        """
+        h = hashStream(self.params.hashFunc, stream)
+        return self.signDigest(h, k, deterministic)
+
+    def signDigest(self, digest, k=None, deterministic=None):
+        """
+        Sign a message already hashed with params.hashFunc.
+        digest is the digest (bytes) or the hashlib object.
+        """
+        start = instrument.now() if instrument.enabled else None
+        order = self.params.order
+        h = hashDigest(digest, order)
 
-        while x == 0 or y == 0:
-            if k is None:
-                k = randomIntegerUnbias(order)
-            k_inv = invMod(k, order)
-            p = k * generator
-            x = p.x % order
-            h = hashMessage(hash_fct, m, order)
+        if deterministic is None:
+            deterministic = self.deterministic
 
-            y = k_inv * ((h + self.__d * x) % order)
-            y %= order
+        for (k, k_inv, x) in self.__nonces(h, k, deterministic):
+            if x != 0:
+                y = k_inv * ((h + self.__d * x) % order)
+                y %= order
+                if y != 0:
+                    if start is not None:
+                        instrument.record('sign', instrument.now() - start)
+                    return ECDSASignature(self.params, x, y)
+            if instrument.enabled:
+                instrument.count('sign.retry')
 
-        return ECDSASignature(self.params, x, y)
+        raise Exception("Invalid nonce k !")
 
 class ECDSAPublicKey:
     """
@@ -50,6 +224,8 @@ class ECDSAPublicKey:
          params: public parameters (curve, order, generator...)
          p: the public point [k]G
     """
+    __slots__ = ('__params', '__p')
+
     def __init__(self, params, p):
         assert isinstance(params, ECDSAParams)
         assert isinstance(p, ECCPoint)
@@ -60,6 +236,9 @@ class ECDSAPublicKey:
         if p.isInfinity():
             raise Exception("Invalid public point !")
 
+        if not p.isOnCurve():
+            raise Exception("Public point isn't on the curve !")
+
         self.__params = params
         self.__p = p
 
@@ -71,20 +250,121 @@ class ECDSAPublicKey:
     def p(self):
         return self.__p
 
+    @classmethod
+    def _trusted(cls, params, p):
+        """ Public key from a point known to be valid, without checks """
+        public = cls.__new__(cls)
+        public.__params = params
+        public.__p = p
+        return public
+
+    def toBytes(self, compressed=False):
+        """ SEC1 encoding of the public point """
+        return self.__p.encode(compressed)
+
+    @classmethod
+    def fromBytes(cls, params, data, validate=False):
+        """
+        Public key from a SEC1 encoded point.
+        With validate, the full validation is done (see validate), and
+        keys already validated are taken from the validation cache,
+        without decoding the point again.
+        """
+        if not validate:
+            return cls(params, params.curve.decodePoint(data))
+
+        key = _validationKey(params, bytes(data))
+        point = _VALIDATION_CACHE.get(key)
+        if point is not None:
+            return cls._trusted(params, point)
+
+        public = cls(params, params.curve.decodePoint(data))
+        if not public.validate():
+            raise Exception("Invalid public key !")
+        _VALIDATION_CACHE.put(key, public.p)
+        return public
+
+    def validate(self):
+        """
+        Full public key validation (SEC1 3.2.2.1) : Q isn't the point at
+        infinity, its coordinates are in [0, p-1], it's on the curve and
+        [n]Q is the point at infinity. The last check is skipped only when
+        the cofactor is known to be 1, as every point of the curve is then
+        in the group generated by G. Valid keys are remembered in the
+        validation cache.
+        """
+        q = self.__p
+        params = self.params
+        curve = params.curve
+        if q.isInfinity():
+            return False
+
+        key = _validationKey(params, q.encode())
+        if key in _VALIDATION_CACHE:
+            _VALIDATION_CACHE.get(key)
+            return True
+
+        if not (0 <= q.x < curve.p and 0 <= q.y < curve.p):
+            return False
+        if not q.isOnCurve():
+            return False
+        if params.cofactor != 1:
+            if not q.multiply(params.order, 'wnaf').isInfinity():
+                return False
+
+        _VALIDATION_CACHE.put(key, q)
+        return True
+
+    def table(self):
+        """
+        Window table of the public point, taken from the public key cache
+        when it's enabled. Without cache, the point itself is returned and
+        the table is built by the multiplication.
+        """
+        cache = _PUBLIC_KEY_CACHE
+        if cache is None:
+            return self.__p
+        key = (self.params.curve, self.__p.x, self.__p.y)
+        table = cache.get(key)
+        if table is None:
+            table = ECCWindowTable(self.__p, _PUBLIC_KEY_WIDTH)
+            cache.put(key, table)
+        return table
+
     def verify(self, sign, m):
         """ Verify an ECDSA signature """
-
-        hash_fct = self.params.hashFunc
-        g = self.params.generator
+        return self.verifyDigest(sign, hashBytes(self.params.hashFunc, m))
+
+    def verifyStream(self, sign, stream):
+        """
+        Verify the signature of a message read from a file object or an
+        iterable of chunks, without loading it in memory
+        """
+        return self.verifyDigest(sign, hashStream(self.params.hashFunc,
+                                                  stream))
+
+    def verifyDigest(self, sign, digest):
+        """
+        Verify the signature of a message already hashed with
+        params.hashFunc (digest is the bytes or the hashlib object).
+        Signatures with r or s out of [1, n-1] are rejected.
+        """
         order = self.params.order
+        if not (0 < sign.r < order and 0 < sign.s < order):
+            return False
+        start = instrument.now() if instrument.enabled else None
 
         y_inv = invMod(sign.s, order)
-        h = hashMessage(hash_fct, m, order)
+        h = hashDigest(digest, order)
         v1 = (h * y_inv) % order
         v2 = (sign.r * y_inv) % order
-        p =  v1 * g + v2 * self.p
+        table = self.params.generatorTable
+        p = self.params.curve.multiScalarMul([(v1, table), (v2, self.table())])
+        result = not p.isInfinity() and sign.r == p.x % order
 
-        return sign.r % order == p.x % order
+        if start is not None:
+            instrument.record('verify', instrument.now() - start)
+        return result
 
 class ECDSASignature:
     """
@@ -93,6 +373,8 @@ class ECDSASignature:
           params: the public parameters associed to the signature
           (x,y): the signature
     """
+    __slots__ = ('params', 'r', 's')
+
     def __init__(self, params, r, s):
         self.r = r
         self.s = s
@@ -102,6 +384,34 @@ class ECDSASignature:
         """ String representation of a signature """
         return "(%d, %d)" % (self.r, self.s)
 
+    def __eq__(self, other):
+        """ Test equality of two signatures """
+        return (self.r, self.s) == (other.r, other.s)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def toDER(self):
+        """ DER encoding : SEQUENCE { INTEGER r, INTEGER s } """
+        return encoding.encodeSignatureDER(self.r, self.s)
+
+    @classmethod
+    def fromDER(cls, params, data):
+        """ Signature from its DER encoding """
+        (r, s) = encoding.decodeSignatureDER(data)
+        return cls(params, r, s)
+
+    def toBytes(self):
+        """ Fixed width r || s encoding """
+        return encoding.encodeSignatureRaw(self.r, self.s,
+                                           self.params.byteLength)
+
+    @classmethod
+    def fromBytes(cls, params, data):
+        """ Signature from its r || s encoding """
+        (r, s) = encoding.decodeSignatureRaw(data, params.byteLength)
+        return cls(params, r, s)
+
 class ECDSAParams:
     """
     ECDSA public parameters.
@@ -110,28 +420,55 @@ class ECDSAParams:
           generator: the ECCPoint used as generator
           order: the order of the generator, i.e order * generator = 0
           h: the hash function used for signature
+          tableWidth: window width of the precomputed generator table
+          cofactor: number of points of the curve divided by the order
+                    (None if unknown)
+          keyPool: optional pool.KeyPool used by genKeys
+          noncePool: optional pool.NoncePool used by sign for random nonces
+    The generator and its order are checked, unless validate is False
+    (only for parameters known to be valid). A Pratt certificate of the
+    order can be given, to prove its primality.
     """
-    def __init__(self, curve, generator, order, h=hashlib.sha256):
+    def __init__(self, curve, generator, order, h=hashlib.sha256,
+                 tableWidth=4, validate=True, cofactor=None,
+                 certificate=None):
         assert isinstance(curve, ECC)
         assert isinstance(generator, ECCPoint)
 
         if generator.isInfinity():
             raise Exception("Generator can't be infinite point !")
 
+        if validate:
+            self.checkDomain(curve, generator, order, certificate)
+
+        self.__curve = curve
+        self.__order = order
+        self.__generator = generator
+        self.__hash_fct = h
+        self.__table_width = tableWidth
+        self.__cofactor = cofactor
+        self.keyPool = None
+        self.noncePool = None
+
+    def __getstate__(self):
+        """ Pools hold a thread, they aren't pickled """
+        state = dict(self.__dict__)
+        state['keyPool'] = None
+        state['noncePool'] = None
+        return state
+
+    @staticmethod
+    def checkDomain(curve, generator, order, certificate=None):
+        """ Check the generator and its order """
         if not generator.isOnCurve():
             raise Exception("Generator isn't on the curve !")
 
-        if not isPrime(order):
+        if not isPrime(order, certificate=certificate):
             raise Exception("Generator order must be prime !")
 
         if (order * generator) != curve.newInfinitePoint():
             raise Exception("Bad order for the generator !")
 
-        self.__curve = curve
-        self.__order = order
-        self.__generator = generator
-        self.__hash_fct = h
-
     @property
     def curve(self):
         return self.__curve
@@ -144,14 +481,173 @@ class ECDSAParams:
     def generator(self):
         return self.__generator
 
+    @property
+    def cofactor(self):
+        return self.__cofactor
+
     @property
     def hashFunc(self):
         return self.__hash_fct
 
+    @property
+    def byteLength(self):
+        """ Length in bytes of the order (size of r, s and d) """
+        return (self.__order.bit_length() + 7) // 8
+
+    @property
+    def generatorTable(self):
+        """
+        Fixed-base table of the generator, built on first use and shared
+        by all the parameters with the same curve, generator and width
+        """
+        g = self.generator
+        key = (self.curve, g.x, g.y, self.__table_width)
+        table = _GENERATOR_TABLES.get(key)
+        if table is None:
+            table = _loadTable(g, self.order.bit_length(), self.__table_width)
+            _GENERATOR_TABLES[key] = table
+        return table
+
+    def mulGenerator(self, k):
+        """ Multiplication of the generator : [k]G """
+        return self.generatorTable.mul(k % self.order)
+
+    def multiply(self, k, point, secret=True):
+        """
+        Multiplication of a point of the curve : [k]P.
+        Secret scalars use the fixed window method over the bit length of
+        the order, public ones the faster wNAF method.
+        """
+        k %= self.order
+        if secret:
+            return point.multiply(k, 'window', self.order.bit_length())
+        return point.multiply(k, 'wnaf')
+
     def genKeys(self):
-        """ Generate public and private key pairs """
+        """
+        Generate public and private key pairs (taken from keyPool when
+        it's set)
+        """
+        start = instrument.now() if instrument.enabled else None
+        if self.keyPool is not None:
+            keys = self.keyPool.pop()
+        else:
+            keys = self.generateKeys()
+
+        if start is not None:
+            instrument.record('genKeys', instrument.now() - start)
+        return keys
+
+    def genKeysBatch(self, n, chunkSize=256):
+        """
+        Generate n key pairs. They are computed by chunks sharing one
+        modular inversion, and returned by an iterator.
+        """
+        def draws():
+            for _ in range(n):
+                yield randomIntegerUnbias(self.order)
+
+        for (d, public) in self.__derive(draws(), chunkSize):
+            yield (public, ECDSAPrivateKey(self, d))
+
+    def derivePublicKeys(self, ds, chunkSize=256):
+        """
+        Public keys [d]G of an iterable of private multipliers, computed
+        by chunks sharing one modular inversion, and returned by an
+        iterator
+        """
+        for (_, public) in self.__derive(ds, chunkSize):
+            yield public
+
+    def __derive(self, ds, chunkSize):
+        """ Iterator of (d, public key) """
+        table = self.generatorTable
+        curve = self.curve
+        ds = iter(ds)
+        while True:
+            chunk = list(itertools.islice(ds, chunkSize))
+            if not chunk:
+                return
+            for d in chunk:
+                if d <= 0 or d >= self.order:
+                    raise Exception("Invalid private key !")
+            points = curve.batchToAffine([table.mulJacobian(d) for d in chunk])
+            for (d, (x, y)) in zip(chunk, points):
+                point = ECCPoint._unchecked(curve, x, y)
+                yield (d, ECDSAPublicKey._trusted(self, point))
+
+    def generateKeys(self):
+        """ Generate a key pair, without using the pool """
         k = randomIntegerUnbias(self.order)
-        public = ECDSAPublicKey(self, k * self.generator)
+        public = ECDSAPublicKey(self, self.mulGenerator(k))
         private = ECDSAPrivateKey(self, k)
-
         return (public, private)
+
+def verifyBatch(items):
+    """
+    Verify many ECDSA signatures at once.
+    items is an iterable of (public key, signature, message) tuples, and a
+    list of booleans is returned, one for each item.
+    Work is shared across the batch : all the s values of a curve are
+    inverted with one modular inversion, the window table of a public key
+    is built once for all its signatures, and the resulting points are
+    converted to affine coordinates with one inversion per curve.
+    """
+    start = instrument.now() if instrument.enabled else None
+    items = list(items)
+    results = [False] * len(items)
+
+    # Hash messages and discard signatures out of range
+    pending = []
+    for (i, (public, sign, m)) in enumerate(items):
+        params = public.params
+        order = params.order
+        if not (0 < sign.r < order and 0 < sign.s < order):
+            continue
+        h = hashDigest(hashBytes(params.hashFunc, m), order)
+        pending.append((i, public, sign, h))
+
+    # Invert all the s values, grouped by order
+    by_order = {}
+    for entry in pending:
+        by_order.setdefault(entry[1].params.order, []).append(entry)
+    s_invs = {}
+    for (order, entries) in by_order.items():
+        invs = batchInvMod([sign.s for (_, _, sign, _) in entries], order)
+        for ((i, _, _, _), inv) in zip(entries, invs):
+            s_invs[i] = inv
+
+    # Compute v1 * G + v2 * Q, sharing one window table per public key
+    tables = {}
+    by_curve = {}
+    for (i, public, sign, h) in pending:
+        params = public.params
+        order = params.order
+        y_inv = s_invs[i]
+        v1 = (h * y_inv) % order
+        v2 = (sign.r * y_inv) % order
+
+        q = public.p
+        key = (params.curve, q.x, q.y)
+        table = tables.get(key)
+        if table is None:
+            table = public.table()
+            if not isinstance(table, ECCWindowTable):
+                table = ECCWindowTable(q)
+            tables[key] = table
+
+        curve = params.curve
+        jp = curve.multiScalarMulJacobian([(v1, params.generatorTable),
+                                           (v2, table)])
+        if jp[2] != 0:
+            by_curve.setdefault(curve, []).append((i, sign.r, order, jp))
+
+    # Back to affine coordinates, one inversion per curve
+    for (curve, entries) in by_curve.items():
+        points = curve.batchToAffine([jp for (_, _, _, jp) in entries])
+        for ((i, r, order, _), (x, _)) in zip(entries, points):
+            results[i] = r == x % order
+
+    if start is not None:
+        instrument.record('verifyBatch', instrument.now() - start)
+    return results
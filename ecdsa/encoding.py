@@ -0,0 +1,120 @@
+"""
+Binary encodings : SEC1 points, DER and raw (r || s) signatures.
+All the decoders accept bytes, bytearray or memoryview objects.
+"""
+
+
+def intToBytes(x, length):
+    """ Big-endian encoding of x on length bytes """
+    return x.to_bytes(length, 'big')
+
+def bytesToInt(data):
+    """ Big-endian decoding of an integer """
+    return int.from_bytes(data, 'big')
+
+def encodePoint(point, compressed=False):
+    """
+    SEC1 encoding of a point :
+      0x00 for the point at infinity
+      0x02 or 0x03 (parity of y) || x when compressed
+      0x04 || x || y otherwise
+    """
+    if point.isInfinity():
+        return b'\x00'
+    length = point.curve.byteLength
+    if compressed:
+        return bytes([2 + (point.y & 1)]) + intToBytes(point.x, length)
+    return b'\x04' + intToBytes(point.x, length) + intToBytes(point.y, length)
+
+def decodePoint(curve, data):
+    """ Decode a SEC1 encoded point, checking it's on the curve """
+    data = memoryview(data)
+    length = curve.byteLength
+    if len(data) == 1 and data[0] == 0:
+        return curve.newInfinitePoint()
+
+    if len(data) == 1 + length and data[0] in (2, 3):
+        x = bytesToInt(data[1:])
+        if x >= curve.p:
+            raise Exception("Invalid point encoding !")
+        y = curve.yFromX(x, data[0] & 1)
+        return curve.newPoint(x, y)
+
+    if len(data) == 1 + 2 * length and data[0] == 4:
+        x = bytesToInt(data[1:1 + length])
+        y = bytesToInt(data[1 + length:])
+        if x >= curve.p or y >= curve.p:
+            raise Exception("Invalid point encoding !")
+        return curve.newPoint(x, y)
+
+    raise Exception("Invalid point encoding !")
+
+def _derLength(n):
+    """ DER encoding of a length """
+    if n < 0x80:
+        return bytes([n])
+    raw = intToBytes(n, (n.bit_length() + 7) // 8)
+    return bytes([0x80 | len(raw)]) + raw
+
+def _derInteger(x):
+    """ DER encoding of a non-negative INTEGER """
+    raw = intToBytes(x, x.bit_length() // 8 + 1)
+    return b'\x02' + _derLength(len(raw)) + raw
+
+def _derParse(data, offset, tag):
+    """
+    Parse a DER element with the given tag at offset.
+    Return (content, offset of the next element)
+    """
+    if offset + 2 > len(data) or data[offset] != tag:
+        raise Exception("Invalid DER encoding !")
+    n = data[offset + 1]
+    offset += 2
+    if n & 0x80:
+        size = n & 0x7f
+        if size == 0 or size > 4 or offset + size > len(data):
+            raise Exception("Invalid DER encoding !")
+        n = bytesToInt(data[offset:offset + size])
+        if n < 0x80 or data[offset] == 0:
+            raise Exception("Invalid DER encoding : length not minimal !")
+        offset += size
+    if offset + n > len(data):
+        raise Exception("Invalid DER encoding !")
+    return (data[offset:offset + n], offset + n)
+
+def _derParseInteger(data, offset):
+    """ Parse a non-negative DER INTEGER, return (value, next offset) """
+    (raw, offset) = _derParse(data, offset, 0x02)
+    if len(raw) == 0 or raw[0] & 0x80:
+        raise Exception("Invalid DER integer !")
+    if len(raw) > 1 and raw[0] == 0 and not raw[1] & 0x80:
+        raise Exception("Invalid DER integer : not minimal !")
+    return (bytesToInt(raw), offset)
+
+def encodeSignatureDER(r, s):
+    """ DER encoding of SEQUENCE { INTEGER r, INTEGER s } """
+    content = _derInteger(r) + _derInteger(s)
+    return b'\x30' + _derLength(len(content)) + content
+
+def decodeSignatureDER(data):
+    """ Decode a DER signature, return (r, s) """
+    data = memoryview(data)
+    (content, end) = _derParse(data, 0, 0x30)
+    if end != len(data):
+        raise Exception("Invalid DER encoding : trailing data !")
+    (r, offset) = _derParseInteger(content, 0)
+    (s, offset) = _derParseInteger(content, offset)
+    if offset != len(content):
+        raise Exception("Invalid DER encoding : trailing data !")
+    return (r, s)
+
+def encodeSignatureRaw(r, s, length):
+    """ Fixed width r || s encoding, each on length bytes """
+    return intToBytes(r, length) + intToBytes(s, length)
+
+def decodeSignatureRaw(data, length):
+    """ Decode a r || s signature, return (r, s) """
+    data = memoryview(data)
+    if len(data) != 2 * length:
+        raise Exception("Invalid raw signature length !")
+    return (bytesToInt(data[:length]), bytesToInt(data[length:]))
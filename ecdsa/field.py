@@ -0,0 +1,191 @@
+"""
+Reduction modulo the prime p of the finite field Fp.
+The generic backend uses Python's %, the others use the special form of
+the prime (generalized Mersenne primes, like the NIST ones).
+"""
+
+
+class PrimeField:
+    """
+    Generic arithmetic modulo p.
+    Attributes:
+          p: the prime modulus
+          generic: True when reduce() is just x % p
+    """
+    generic = True
+
+    def __init__(self, p):
+        self.p = p
+
+    def reduce(self, x):
+        """ x mod p """
+        return x % self.p
+
+    def __repr__(self):
+        return "%s(%d)" % (self.__class__.__name__, self.p)
+
+class SolinasField(PrimeField):
+    """
+    Generic pseudo-Mersenne fold modulo a prime p = 2^k - c, with c < 2^k.
+    As 2^k = c (mod p), the high part of x is folded onto the low part :
+    x = H*2^k + L = H*c + L (mod p). Each fold removes k - log2(c) bits,
+    which is few for the NIST primes (about 32 bits for P-256, where
+    c = 2^224 - 2^192 - 2^96 + 1) : see NISTField for their dedicated
+    reductions.
+    """
+    generic = False
+
+    def __init__(self, p):
+        PrimeField.__init__(self, p)
+        self.k = p.bit_length()
+        self.c = (1 << self.k) - p
+        self.mask = (1 << self.k) - 1
+        if self.c.bit_length() >= self.k:
+            raise Exception("%d isn't a Solinas prime !" % p)
+
+    def reduce(self, x):
+        """ x mod p """
+        if x < 0:
+            return x % self.p
+        (k, c, mask) = (self.k, self.c, self.mask)
+        while x >> k:
+            x = (x & mask) + (x >> k) * c
+        return x - self.p if x >= self.p else x
+
+class MersenneField(PrimeField):
+    """
+    Reduction modulo a Mersenne prime p = 2^k - 1 (P-521) :
+    x = H*2^k + L = H + L (mod p).
+    """
+    generic = False
+
+    def __init__(self, p):
+        PrimeField.__init__(self, p)
+        if p & (p + 1) != 0:
+            raise Exception("%d isn't a Mersenne prime !" % p)
+        self.k = p.bit_length()
+
+    def reduce(self, x):
+        """ x mod p """
+        if x < 0:
+            return x % self.p
+        (k, p) = (self.k, self.p)
+        while x >> k:
+            x = (x & p) + (x >> k)
+        return 0 if x == p else x
+
+def _words(x, first, last, size=32):
+    """ The words first to last (included) of x, as an integer """
+    return (x >> (size * first)) & ((1 << (size * (last - first + 1))) - 1)
+
+class NISTField(PrimeField):
+    """
+    Fast reduction of FIPS 186-4 (appendix D.2) for the NIST primes P-192,
+    P-224, P-256 and P-384 : the 2k bits of x are split in 32-bit (64-bit
+    for P-192) words, rearranged in a few k bits integers whose sum and
+    differences give x mod p, up to a few additions or subtractions of p.
+    """
+    generic = False
+
+    P192 = 2**192 - 2**64 - 1
+    P224 = 2**224 - 2**96 + 1
+    P256 = 2**256 - 2**224 + 2**192 + 2**96 - 1
+    P384 = 2**384 - 2**128 - 2**96 + 2**32 - 1
+
+    def __init__(self, p):
+        PrimeField.__init__(self, p)
+        reducers = {
+            NISTField.P192: self._reduce192,
+            NISTField.P224: self._reduce224,
+            NISTField.P256: self._reduce256,
+            NISTField.P384: self._reduce384,
+        }
+        if p not in reducers:
+            raise Exception("%d isn't a NIST prime !" % p)
+        self.reduce = reducers[p]
+        self.k = p.bit_length()
+
+    def _normalize(self, x):
+        """ x mod p, for x within a few p of [0, p) """
+        p = self.p
+        while x < 0:
+            x += p
+        while x >= p:
+            x -= p
+        return x
+
+    def _reduce192(self, x):
+        if x < 0 or x >> 384:
+            return x % self.p
+        a3 = _words(x, 3, 3, 64)
+        a4 = _words(x, 4, 4, 64)
+        a5 = x >> 320
+        r = ((x & ((1 << 192) - 1)) + (a3 | (a3 << 64)) +
+             ((a4 << 64) | (a4 << 128)) + (a5 | (a5 << 64) | (a5 << 128)))
+        return self._normalize(r)
+
+    def _reduce224(self, x):
+        if x < 0 or x >> 448:
+            return x % self.p
+        c11_13 = x >> 352
+        r = ((x & ((1 << 224) - 1)) + (_words(x, 7, 10) << 96) +
+             (c11_13 << 96) - (x >> 224) - c11_13)
+        return self._normalize(r)
+
+    def _reduce256(self, x):
+        if x < 0 or x >> 512:
+            return x % self.p
+        c8 = _words(x, 8, 8)
+        c10 = _words(x, 10, 10)
+        c11 = _words(x, 11, 11)
+        c12 = _words(x, 12, 12)
+        c13 = _words(x, 13, 13)
+        c8_10 = _words(x, 8, 10)
+        c9_11 = _words(x, 9, 11)
+        c13_15 = x >> 416
+        c14_15 = x >> 448
+        s1 = x & ((1 << 256) - 1)
+        s2 = (x >> 352) << 96
+        s3 = (x >> 384) << 96
+        s4 = c8_10 | (c14_15 << 192)
+        s5 = c9_11 | (c13_15 << 96) | (c13 << 192) | (c8 << 224)
+        d1 = _words(x, 11, 13) | (c8 << 192) | (c10 << 224)
+        d2 = (x >> 384) | (_words(x, 9, 9) << 192) | (c11 << 224)
+        d3 = c13_15 | (c8_10 << 96) | (c12 << 224)
+        d4 = c14_15 | (c9_11 << 96) | (c13 << 224)
+        r = s1 + 2 * (s2 + s3) + s4 + s5 - d1 - d2 - d3 - d4
+        return self._normalize(r)
+
+    def _reduce384(self, x):
+        if x < 0 or x >> 768:
+            return x % self.p
+        c20 = _words(x, 20, 20)
+        c23 = x >> 736
+        c21_23 = x >> 672
+        c20_23 = x >> 640
+        s1 = c21_23 << 128
+        s2 = x >> 384
+        s3 = c21_23 | (_words(x, 12, 20) << 96)
+        s4 = (c23 << 32) | (c20 << 96) | (_words(x, 12, 19) << 128)
+        s5 = c20_23 << 128
+        s6 = c20 | (c21_23 << 96)
+        d1 = c23 | (_words(x, 12, 22) << 32)
+        d2 = c20_23 << 32
+        d3 = (c23 << 96) | (c23 << 128)
+        r = ((x & ((1 << 384) - 1)) + 2 * s1 + s2 + s3 + s4 + s5 + s6 -
+             d1 - d2 - d3)
+        return self._normalize(r)
+
+def fieldFor(p):
+    """
+    Fastest backend for the prime p.
+    With CPython, the Mersenne fold beats % (about 2x for P-521), but for
+    the other NIST primes both the generic fold and the FIPS 186-4 word
+    rearrangements (NISTField) are slower than the single big integer %
+    (several times slower, as each word costs a few interpreted
+    operations), so they keep the generic backend (see
+    bench/bench_field.py).
+    """
+    if p > 3 and p & (p + 1) == 0:
+        return MersenneField(p)
+    return PrimeField(p)
@@ -0,0 +1,124 @@
+"""
+Opt-in instrumentation : operation counters, latency histograms and
+callbacks to export them. It's disabled by default, and the instrumented
+code then only tests the enabled flag.
+
+Counters : point.add and point.double (the operations really computed :
+an addition of equal points is a doubling, one with the point at infinity
+isn't counted), point.dummyAdd (additions of the constant time methods
+whose result is unused), point.isOnCurve, field.inversion,
+random.rejection (draws rejected by randomIntegerUnbias) and sign.retry
+(nonces giving r = 0 or s = 0).
+Latencies : hash, sign, verify, verifyBatch, genKeys.
+"""
+
+import threading
+import time
+
+enabled = False
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_callbacks = []
+
+
+class Histogram:
+    """
+    Latency histogram with power of two buckets (in microseconds).
+    Attributes:
+          count: number of values
+          total: sum of the values, in seconds
+          min, max: extreme values, in seconds
+          buckets: dict of bucket upper bound (us) => number of values
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = {}
+
+    def add(self, seconds):
+        """ Record a value """
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+        bound = 1 << max(0, int(seconds * 1e6)).bit_length()
+        self.buckets[bound] = self.buckets.get(bound, 0) + 1
+
+    def percentile(self, q):
+        """ Upper bound (in seconds) of the bucket holding the q-th percentile """
+        rank = self.count * q / 100.0
+        seen = 0
+        for bound in sorted(self.buckets):
+            seen += self.buckets[bound]
+            if seen >= rank:
+                return bound / 1e6
+        return None
+
+    def asDict(self):
+        return {'count': self.count, 'total': self.total, 'min': self.min,
+                'max': self.max, 'p50': self.percentile(50),
+                'p99': self.percentile(99), 'buckets': dict(self.buckets)}
+
+def enable():
+    """ Start collecting """
+    global enabled
+    enabled = True
+
+def disable():
+    """ Stop collecting (collected values are kept) """
+    global enabled
+    enabled = False
+
+def reset():
+    """ Clear the counters and histograms """
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+def count(name, n=1):
+    """ Increment a counter """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+    for fct in _callbacks:
+        fct('count', name, n)
+
+def record(name, seconds):
+    """ Record the latency of an operation """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+    for fct in _callbacks:
+        fct('latency', name, seconds)
+
+def now():
+    """ Clock used for the latencies """
+    return time.perf_counter()
+
+def addCallback(fct):
+    """
+    Call fct(kind, name, value) for each event, where kind is 'count'
+    (value is the increment) or 'latency' (value is in seconds)
+    """
+    _callbacks.append(fct)
+
+def removeCallback(fct):
+    """ Unregister a callback """
+    _callbacks.remove(fct)
+
+def counters():
+    """ Copy of the counters """
+    with _lock:
+        return dict(_counters)
+
+def histograms():
+    """ Latency histograms, as dicts """
+    with _lock:
+        return dict((name, h.asDict()) for (name, h) in _histograms.items())
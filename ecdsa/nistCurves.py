@@ -1,9 +1,39 @@
 from .ecdsaAlgo import *
 
-class ECDSAParamsP192(ECDSAParams):
+# Curve and generator of each standard parameter set, once validated
+_DOMAINS = {}
+
+# Shared instances returned by getParams
+_PARAMS = {}
+
+class ECDSAParamsNIST(ECDSAParams):
+    """
+    Base class of the standard FIPS-186 parameter sets.
+    The domain parameters are checked the first time a parameter set is
+    instantiated, then the curve and generator are shared by the next
+    instances (and so is the generator table).
+    """
+    name = None
+
+    def __init__(self, h=hashlib.sha256, tableWidth=4):
+        cls = self.__class__
+        domain = _DOMAINS.get(cls)
+        if domain is None:
+            curve = ECC(cls.a, cls.b, cls.p)
+            g = curve.newPoint(cls.gx, cls.gy)
+            ECDSAParams.__init__(self, curve, g, cls.order, h, tableWidth,
+                                 cofactor=1)
+            _DOMAINS[cls] = (curve, g)
+        else:
+            (curve, g) = domain
+            ECDSAParams.__init__(self, curve, g, cls.order, h, tableWidth,
+                                 validate=False, cofactor=1)
+
+class ECDSAParamsP192(ECDSAParamsNIST):
     """
     Standard FIPS-186 : P192 curve
     """
+    name = 'P-192'
     p = int('6277101735386680763835789423207666416083908700390324961279')
     order = int('6277101735386680763835789423176059013767194773182842284081')
     a = (-3) % p
@@ -11,15 +41,11 @@ class ECDSAParamsP192(ECDSAParams):
     gx = int('188da80eb03090f67cbf20eb43a18800f4ff0afd82ff1012', 16)
     gy = int('07192b95ffc8da78631011ed6b24cdd573f977a11e794811', 16)
 
-    def __init__(self, h=hashlib.sha256):
-        curve = ECC(self.__class__.a, self.__class__.b, self.__class__.p)
-        g = curve.newPoint(self.__class__.gx, self.__class__.gy)
-        ECDSAParams.__init__(self, curve, g, self.__class__.order, h)
-
-class ECDSAParamsP224(ECDSAParams):
+class ECDSAParamsP224(ECDSAParamsNIST):
     """
     Standard FIPS-186 : P224 curve
     """
+    name = 'P-224'
     p = int('2695994666715063979466701508701963067355791626002630814351' \
             '0066298881')
     order = int('269599466671506397946670150870196259404578077144243917' \
@@ -29,15 +55,11 @@ class ECDSAParamsP224(ECDSAParams):
     gx = int('b70e0cbd6bb4bf7f321390b94a03c1d356c21122343280d6115c1d21', 16)
     gy = int('bd376388b5f723fb4c22dfe6cd4375a05a07476444d5819985007e34', 16)
 
-    def __init__(self, h=hashlib.sha256):
-        curve = ECC(self.__class__.a, self.__class__.b, self.__class__.p)
-        g = curve.newPoint(self.__class__.gx, self.__class__.gy)
-        ECDSAParams.__init__(self, curve, g, self.__class__.order, h)
-
-class ECDSAParamsP256(ECDSAParams):
+class ECDSAParamsP256(ECDSAParamsNIST):
     """
     Standard FIPS-186 : P256 curve
     """
+    name = 'P-256'
     p = int('115792089210356248762697446949407573530086143415290314195' \
             '533631308867097853951')
     order = int('11579208921035624876269744694940757352999695522413576' \
@@ -50,15 +72,11 @@ class ECDSAParamsP256(ECDSAParams):
     gy = int('4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb64068' \
              '37bf51f5', 16)
 
-    def __init__(self, h=hashlib.sha256):
-        curve = ECC(self.__class__.a, self.__class__.b, self.__class__.p)
-        g = curve.newPoint(self.__class__.gx, self.__class__.gy)
-        ECDSAParams.__init__(self, curve, g, self.__class__.order, h)
-
-class ECDSAParamsP384(ECDSAParams):
+class ECDSAParamsP384(ECDSAParamsNIST):
     """
     Standard FIPS-186 : P384 curve
     """
+    name = 'P-384'
     p = int('394020061963944792122790401001436138050797392704654466679' \
             '482934042457217714968703290472660882589380018616069731123' \
             '19')
@@ -73,15 +91,11 @@ class ECDSAParamsP384(ECDSAParams):
     gy = int('3617de4a96262c6f5d9e98bf9292dc29f8f41dbd289a147ce9da3113b' \
              '5f0b8c00a60b1ce1d7e819d7a431d7c90ea0e5f', 16)
 
-    def __init__(self, h=hashlib.sha256):
-        curve = ECC(self.__class__.a, self.__class__.b, self.__class__.p)
-        g = curve.newPoint(self.__class__.gx, self.__class__.gy)
-        ECDSAParams.__init__(self, curve, g, self.__class__.order, h)
-
-class ECDSAParamsP521(ECDSAParams):
+class ECDSAParamsP521(ECDSAParamsNIST):
     """
     Standard FIPS-186 : P521 curve
     """
+    name = 'P-521'
     p = int('6864797660130609714981900799081393217269435300143305409394463459' \
             '1855431833976560521225596406614545549772963113914808580371219879' \
             '99716643812574028291115057151')
@@ -99,7 +113,24 @@ class ECDSAParamsP521(ECDSAParams):
              '662c97ee72995ef42640c550b9013fad0761353c7086a272c24088be94769fd' \
              '16650', 16)
 
-    def __init__(self, h=hashlib.sha256):
-        curve = ECC(self.__class__.a, self.__class__.b, self.__class__.p)
-        g = curve.newPoint(self.__class__.gx, self.__class__.gy)
-        ECDSAParams.__init__(self, curve, g, self.__class__.order, h)
+NIST_CURVES = {
+    'P-192': ECDSAParamsP192,
+    'P-224': ECDSAParamsP224,
+    'P-256': ECDSAParamsP256,
+    'P-384': ECDSAParamsP384,
+    'P-521': ECDSAParamsP521,
+}
+
+def getParams(name, h=hashlib.sha256, tableWidth=4):
+    """
+    Shared instance of a standard parameter set, e.g getParams('P-256').
+    The same object is returned for the same name, hash and table width.
+    """
+    if name not in NIST_CURVES:
+        raise Exception("Unknown curve %s !" % name)
+    key = (name, h, tableWidth)
+    params = _PARAMS.get(key)
+    if params is None:
+        params = NIST_CURVES[name](h, tableWidth)
+        _PARAMS[key] = params
+    return params
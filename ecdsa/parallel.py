@@ -0,0 +1,143 @@
+"""
+Signing and verification spread over a pool of worker processes.
+Keys are sent once to each worker, when it starts, and the requests only
+carry a key identifier.
+"""
+
+from .ecdsaAlgo import ECDSASignature, verifyBatch
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+
+# Keys of the worker process, installed by _initWorker
+_WORKER_KEYS = {}
+
+
+def _initWorker(keys):
+    """
+    Install the keys in the worker and build the generator tables.
+    The key and nonce pools copied from the parent by a fork are dropped,
+    their entries must not be used by several processes.
+    """
+    global _WORKER_KEYS
+    _WORKER_KEYS = keys
+    for key in keys.values():
+        key.params.keyPool = None
+        key.params.noncePool = None
+        key.params.generatorTable
+
+def _verifyChunk(chunk):
+    """ Verify a list of (key id, r, s, message) in a worker """
+    items = []
+    for (key_id, r, s, m) in chunk:
+        public = _WORKER_KEYS[key_id]
+        items.append((public, ECDSASignature(public.params, r, s), m))
+    return verifyBatch(items)
+
+def _signChunk(chunk):
+    """ Sign a list of (key id, message) in a worker """
+    result = []
+    for (key_id, m) in chunk:
+        sig = _WORKER_KEYS[key_id].sign(m)
+        result.append((sig.r, sig.s))
+    return result
+
+def _chunks(iterable, size):
+    """ Split an iterable in lists of at most size elements """
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+class ParallelPool:
+    """
+    Process pool holding a set of keys.
+    Attributes:
+          keys: dict of key id => key, sent once to each worker
+          workers: number of processes (default: number of CPUs)
+          chunkSize: number of requests sent to a worker at once
+          context: multiprocessing context, or start method name such as
+                   'spawn' (default: the platform's one)
+    """
+    def __init__(self, keys, workers=None, chunkSize=64, context=None):
+        if chunkSize < 1:
+            raise Exception("Chunk size must be positive !")
+
+        if isinstance(context, str):
+            context = multiprocessing.get_context(context)
+
+        self.keys = dict(keys)
+        self.chunkSize = chunkSize
+        self.__executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_initWorker,
+            initargs=(self.keys,))
+
+    def _task(self, chunk):
+        """ Function run by the workers, and the request for a chunk """
+        raise NotImplementedError()
+
+    def _result(self, chunk, result):
+        """ Results for a chunk, from the worker's output """
+        return result
+
+    def map(self, items):
+        """ Process the items, and return the results in the same order """
+        (fct, chunks) = self._task(items)
+        for (chunk, result) in zip(chunks, self.__executor.map(fct, chunks)):
+            for r in self._result(chunk, result):
+                yield r
+
+    async def amap(self, items):
+        """ Awaitable version of map, returning a list """
+        (fct, chunks) = self._task(items)
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(self.__executor, fct, chunk)
+                   for chunk in chunks]
+        results = []
+        for (chunk, result) in zip(chunks, await asyncio.gather(*futures)):
+            results.extend(self._result(chunk, result))
+        return results
+
+    def close(self):
+        """ Stop the worker processes """
+        self.__executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class ParallelVerifier(ParallelPool):
+    """
+    Verify signatures in a process pool.
+    keys is a dict of key id => ECDSAPublicKey, and the items to verify are
+    (key id, signature, message) tuples. Results are booleans.
+    """
+    def _task(self, items):
+        requests = [(key_id, sig.r, sig.s, m) for (key_id, sig, m) in items]
+        return (_verifyChunk, list(_chunks(requests, self.chunkSize)))
+
+    async def averify(self, key_id, sign, m):
+        """ Verify one signature without blocking the event loop """
+        return (await self.amap([(key_id, sign, m)]))[0]
+
+class ParallelSigner(ParallelPool):
+    """
+    Sign messages in a process pool.
+    keys is a dict of key id => ECDSAPrivateKey, and the items to sign are
+    (key id, message) tuples. Results are ECDSASignature objects.
+    """
+    def _task(self, items):
+        return (_signChunk, list(_chunks(items, self.chunkSize)))
+
+    def _result(self, chunk, result):
+        return [ECDSASignature(self.keys[key_id].params, r, s)
+                for ((key_id, _), (r, s)) in zip(chunk, result)]
+
+    async def asign(self, key_id, m):
+        """ Sign one message without blocking the event loop """
+        return (await self.amap([(key_id, m)]))[0]
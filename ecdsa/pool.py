@@ -0,0 +1,164 @@
+"""
+Pools of key pairs and nonces generated in advance by a background
+thread, so genKeys and sign only have to pop an entry.
+"""
+
+from .utils import randomIntegerUnbias, invMod
+from collections import deque
+import os
+import threading
+import weakref
+
+# Pools of the process, reset in the child processes after a fork
+_POOLS = weakref.WeakSet()
+
+
+def _afterFork():
+    for pool in list(_POOLS):
+        pool._afterFork()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_afterFork)
+
+
+class PrecomputedPool:
+    """
+    Entries generated in a background thread.
+    The thread refills the pool up to the high watermark as soon as its
+    depth drops below the low watermark. Each entry is handed out once :
+    it's removed from the pool when popped. When the pool is empty, the
+    entry is generated synchronously (a miss).
+    Python can't overwrite the memory of an integer, so the pool can only
+    drop its references to the entries (when they're popped, and when the
+    pool is closed).
+    A forked child process starts with an empty pool (and its own thread),
+    so the parent and the child never hand out the same entries.
+    Attributes:
+          params: the ECDSA parameters
+          low, high: the watermarks
+    """
+    def __init__(self, params, low=16, high=64, start=True):
+        if not 0 <= low < high:
+            raise Exception("Watermarks must satisfy 0 <= low < high !")
+
+        self.params = params
+        self.low = low
+        self.high = high
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.__entries = deque()
+        self.__cond = threading.Condition()
+        self.__closed = False
+        self.__thread = None
+        self.__restart = False
+        self.__pid = os.getpid()
+        _POOLS.add(self)
+        if start:
+            self.start()
+
+    def _afterFork(self):
+        """
+        Drop the entries copied from the parent process. The lock may have
+        been held by the parent's thread, which doesn't exist in the child,
+        so it's replaced. The thread is started again on the next pop.
+        """
+        self.__entries = deque()
+        self.__cond = threading.Condition()
+        self.__restart = self.__thread is not None and not self.__closed
+        self.__thread = None
+        self.__pid = os.getpid()
+
+    def generate(self):
+        """ Create a new entry """
+        raise NotImplementedError()
+
+    def start(self):
+        """ Start the background thread """
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__run, daemon=True)
+            self.__thread.start()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while not self.__closed and len(self.__entries) >= self.low:
+                    self.__cond.wait()
+                if self.__closed:
+                    return
+            while True:
+                entry = self.generate()
+                with self.__cond:
+                    if self.__closed:
+                        return
+                    self.__entries.append(entry)
+                    self.generated += 1
+                    if len(self.__entries) >= self.high:
+                        break
+
+    def pop(self):
+        """ Take an entry out of the pool """
+        if self.__pid != os.getpid():
+            self._afterFork()
+        if self.__restart:
+            self.__restart = False
+            self.start()
+        with self.__cond:
+            if self.__entries:
+                entry = self.__entries.popleft()
+                self.hits += 1
+            else:
+                entry = None
+                self.misses += 1
+            if len(self.__entries) < self.low:
+                self.__cond.notify()
+        if entry is None:
+            entry = self.generate()
+        return entry
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def stats(self):
+        """ Pool depth and counters """
+        return {'depth': len(self), 'hits': self.hits, 'misses': self.misses,
+                'generated': self.generated}
+
+    def close(self):
+        """ Stop the background thread and drop the unused entries """
+        with self.__cond:
+            self.__closed = True
+            self.__entries.clear()
+            self.__cond.notify()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class KeyPool(PrecomputedPool):
+    """
+    Key pairs (public, private) generated in advance.
+    Install it with params.keyPool = KeyPool(params) to make genKeys use it.
+    """
+    def generate(self):
+        return self.params.generateKeys()
+
+class NoncePool(PrecomputedPool):
+    """
+    Nonces (k, k^-1 mod n, r) generated in advance, with r = ([k]G).x mod n.
+    They don't depend on the private key. Install it with
+    params.noncePool = NoncePool(params) to make sign use it for random
+    nonces.
+    """
+    def generate(self):
+        order = self.params.order
+        while True:
+            k = randomIntegerUnbias(order)
+            r = self.params.mulGenerator(k).x % order
+            if r != 0:
+                return (k, invMod(k, order), r)
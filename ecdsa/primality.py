@@ -0,0 +1,172 @@
+"""
+Primality testing of the domain parameters : trial division, then the
+Baillie-PSW test (strong base-2 test and strong Lucas test), which has no
+known counterexample and is proven for n < 2^64. Pratt certificates can be
+given instead, to prove the primality. Primes are memoized.
+"""
+
+from .utils import LRUCache
+from math import gcd, isqrt
+
+
+def _smallPrimes(bound):
+    """ Primes lower than bound (sieve of Eratosthenes) """
+    sieve = bytearray([1]) * bound
+    sieve[0:2] = b'\x00\x00'
+    for i in range(2, isqrt(bound - 1) + 1):
+        if sieve[i]:
+            sieve[i*i::i] = bytes(len(range(i*i, bound, i)))
+    return [i for i in range(bound) if sieve[i]]
+
+SMALL_PRIMES = _smallPrimes(1000)
+_SMALL_BOUND = SMALL_PRIMES[-1]
+_SMALL_PRODUCT = 1
+for _p in SMALL_PRIMES:
+    _SMALL_PRODUCT *= _p
+
+# Baillie-PSW has been checked for all n below this bound
+_BPSW_PROVEN = 1 << 64
+
+# Numbers already known to be prime
+_PRIME_CACHE = LRUCache(256)
+
+
+def jacobi(a, n):
+    """ Jacobi symbol (a/n), for n odd and positive """
+    a %= n
+    result = 1
+    while a != 0:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+def isStrongProbablePrime(n, a):
+    """ Strong Fermat (Miller-Rabin) test of the odd number n to base a """
+    s, d = 0, n-1
+    while d % 2 == 0:
+        s, d = s+1, d//2
+    x = pow(a, d, n)
+    if x == 1 or x == n-1:
+        return True
+    for r in range(1, s):
+        x = (x * x) % n
+        if x == n-1:
+            return True
+        if x == 1:
+            return False
+    return False
+
+def isStrongLucasProbablePrime(n):
+    """
+    Strong Lucas test of the odd number n, with the parameters of Selfridge
+    (D the first of 5, -7, 9, -11... with (D/n) = -1, P = 1, Q = (1-D)/4)
+    """
+    r = isqrt(n)
+    if r * r == n:
+        return False
+
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    s, d = 0, n+1
+    while d % 2 == 0:
+        s, d = s+1, d//2
+
+    # U_k, V_k and Q^k for the bits of d, from k = 1
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V = (U * V) % n, (V * V - 2 * Qk) % n
+        Qk = (Qk * Qk) % n
+        if bit == '1':
+            U, V = P * U + V, D * U + P * V
+            if U & 1:
+                U += n
+            if V & 1:
+                V += n
+            U, V = (U // 2) % n, (V // 2) % n
+            Qk = (Qk * Q) % n
+
+    if U == 0 or V == 0:
+        return True
+    for r in range(1, s):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = (Qk * Qk) % n
+    return False
+
+def isProbablePrime(n):
+    """ Trial division then Baillie-PSW test """
+    if n <= _SMALL_BOUND:
+        return n in SMALL_PRIMES
+    if gcd(n, _SMALL_PRODUCT) != 1:
+        return False
+    if n < _SMALL_BOUND * _SMALL_BOUND:
+        return True
+    return isStrongProbablePrime(n, 2) and isStrongLucasProbablePrime(n)
+
+def verifyCertificate(n, certificate):
+    """
+    Check a Pratt certificate of n. The certificate is (a, factors), where
+    a is a primitive root modulo n and factors maps each prime factor q of
+    n-1 to its own certificate. Factors lower than 2^64 can be given with
+    None, they are checked with Baillie-PSW.
+    """
+    if n <= _SMALL_BOUND:
+        return n in SMALL_PRIMES
+    (a, factors) = certificate
+
+    m = n - 1
+    for q in factors:
+        if q < 2 or m % q != 0:
+            return False
+        while m % q == 0:
+            m //= q
+    if m != 1:
+        return False
+
+    if pow(a, n-1, n) != 1:
+        return False
+    for (q, sub) in factors.items():
+        if pow(a, (n-1) // q, n) == 1:
+            return False
+        if sub is None:
+            if q >= _BPSW_PROVEN or not isProbablePrime(q):
+                return False
+        elif not verifyCertificate(q, sub):
+            return False
+    return True
+
+def isPrime(n, *, certificate=None):
+    """
+    Primality of n, with Baillie-PSW or with a Pratt certificate (see
+    verifyCertificate). Primes are memoized.
+    """
+    if _PRIME_CACHE.get(n):
+        return True
+
+    if certificate is not None:
+        result = verifyCertificate(n, certificate)
+    else:
+        result = isProbablePrime(n)
+
+    if result:
+        _PRIME_CACHE.put(n, True)
+    return result
+
+def primeCache():
+    """ The cache of the numbers known to be prime """
+    return _PRIME_CACHE
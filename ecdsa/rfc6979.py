@@ -0,0 +1,71 @@
+"""
+Deterministic generation of the ECDSA nonce k, as described in RFC 6979.
+"""
+
+import hmac
+
+
+def int2octets(x, rlen):
+    """ Integer to big-endian string of rlen bytes """
+    return x.to_bytes(rlen, 'big')
+
+def bits2int(b, qlen):
+    """ Leftmost qlen bits of a byte string, as an integer """
+    x = int.from_bytes(b, 'big')
+    blen = len(b) * 8
+    if blen > qlen:
+        x >>= blen - qlen
+    return x
+
+class RFC6979:
+    """
+    Nonce generator bound to one private key.
+    The HMAC state after absorbing the message-independent prefix
+    V || 0x00 || int2octets(d) is computed once, and copied for each
+    signature.
+    Attributes:
+          order: the order of the generator
+          hash_fct: the hash function used by HMAC
+    """
+    def __init__(self, d, order, hash_fct):
+        self.order = order
+        self.hash_fct = hash_fct
+        self.qlen = order.bit_length()
+        self.rlen = (self.qlen + 7) // 8
+
+        hlen = hash_fct().digest_size
+        self.__x = int2octets(d, self.rlen)
+        self.__v0 = b'\x01' * hlen
+        self.__k0_prefix = hmac.new(b'\x00' * hlen, self.__v0 + b'\x00' +
+                                    self.__x, hash_fct)
+
+    def __mac(self, key, data):
+        return hmac.new(key, data, self.hash_fct).digest()
+
+    def nonces(self, h):
+        """
+        Generate the successive candidates for k, for the hashed message h
+        (an integer, as returned by hashMessage). The first one is used,
+        the next ones only if the signature has to be computed again.
+        """
+        h1 = int2octets(h % self.order, self.rlen)
+
+        # Steps d. to g. of RFC 6979 section 3.2
+        mac = self.__k0_prefix.copy()
+        mac.update(h1)
+        K = mac.digest()
+        V = self.__mac(K, self.__v0)
+        K = self.__mac(K, V + b'\x01' + self.__x + h1)
+        V = self.__mac(K, V)
+
+        # Step h.
+        while True:
+            T = b''
+            while len(T) * 8 < self.qlen:
+                V = self.__mac(K, V)
+                T += V
+            k = bits2int(T, self.qlen)
+            if 1 <= k < self.order:
+                yield k
+            K = self.__mac(K, V + b'\x00')
+            V = self.__mac(K, V)
@@ -0,0 +1,197 @@
+"""
+Compact binary format of the precomputed tables (fixed-base tables of
+generators, window tables of public keys), so they can be saved once and
+loaded by many processes. Loading maps the file in memory, so the
+processes read the same pages of the page cache. The checksum only
+detects accidental corruption, so the entries of a loaded table are also
+checked (see the check method of the tables), which decodes them all.
+They are then kept as Python integers by default. With lazy loading they
+are decoded again on each access instead : the table stays shared in
+the page cache, but a multiplication is about 1.5x slower (P-256).
+
+Format (big-endian) :
+    magic 'ECTB' | version (2 bytes) | kind (1 byte) | width (1 byte) |
+    bits (4 bytes) | coordinate length L (2 bytes) | entries (4 bytes) |
+    SHA-256 of the fields above and of everything after this one
+    (32 bytes) |
+    a | b | p | x | y of the base point (L bytes each) |
+    entries, as x | y (L bytes each)
+"""
+
+from .ecc import ECC, ECCFixedBaseTable, ECCWindowTable
+from . import encoding
+import hashlib
+import mmap
+import struct
+
+MAGIC = b'ECTB'
+VERSION = 1
+KIND_FIXED_BASE = 1
+KIND_WINDOW = 2
+
+_HEADER = struct.Struct('>4sHBBIHI')
+_DIGEST_SIZE = 32
+
+
+class MappedEntries:
+    """
+    Read-only sequence of (x, y) entries, decoded from a buffer on access.
+    Attributes:
+          count: number of entries
+    """
+    __slots__ = ('__view', '__offset', '__length', 'count')
+
+    def __init__(self, view, offset, length, count):
+        self.__view = view
+        self.__offset = offset
+        self.__length = length
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("Table index out of range")
+        length = self.__length
+        start = self.__offset + 2 * length * i
+        view = self.__view
+        return (int.from_bytes(view[start:start + length], 'big'),
+                int.from_bytes(view[start + length:start + 2 * length], 'big'))
+
+class MappedRows:
+    """ Rows of a fixed-base table stored in a buffer """
+    __slots__ = ('__rows',)
+
+    def __init__(self, view, offset, length, nrows, per_row):
+        self.__rows = [MappedEntries(view, offset + 2 * length * per_row * i,
+                                     length, per_row)
+                       for i in range(nrows)]
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def __getitem__(self, i):
+        return self.__rows[i]
+
+def _entries(table):
+    """ (kind, bits, entries) of a table """
+    if isinstance(table, ECCFixedBaseTable):
+        return (KIND_FIXED_BASE, table.bits,
+                [entry for row in table.rows for entry in row])
+    if isinstance(table, ECCWindowTable):
+        return (KIND_WINDOW, 0, list(table.odd))
+    raise Exception("Unknown table type !")
+
+def _expectedEntries(kind, width, bits):
+    if kind == KIND_FIXED_BASE:
+        return ((bits + width - 1) // width) * ((1 << width) - 1)
+    return 1 << (width - 2)
+
+def dumpTable(table):
+    """ Binary encoding of a table """
+    (kind, bits, entries) = _entries(table)
+    point = table.point
+    curve = point.curve
+    length = curve.byteLength
+
+    body = bytearray()
+    for value in (curve.a % curve.p, curve.b % curve.p, curve.p, point.x,
+                  point.y):
+        body += encoding.intToBytes(value, length)
+    for entry in entries:
+        if entry is None:
+            raise Exception("Can't save a table with infinite points !")
+        body += encoding.intToBytes(entry[0], length)
+        body += encoding.intToBytes(entry[1], length)
+
+    header = _HEADER.pack(MAGIC, VERSION, kind, table.width, bits, length,
+                          len(entries))
+    digest = hashlib.sha256(header + body).digest()
+    return header + digest + bytes(body)
+
+def saveTable(table, path):
+    """ Save a table in the file path """
+    with open(path, 'wb') as fd:
+        fd.write(dumpTable(table))
+
+def parseTable(data, curve=None, verify=True, lazy=False):
+    """
+    Table from its binary encoding (bytes, memoryview, mmap...). If curve
+    is given, the table must be for this curve. With verify, the checksum
+    is checked. The entries are always checked.
+    The entries are decoded into lists, unless lazy is True : they are
+    then decoded from data each time they are used (data must stay alive),
+    which saves memory but makes each multiplication slower.
+    """
+    view = memoryview(data)
+    if len(view) < _HEADER.size + _DIGEST_SIZE:
+        raise Exception("Invalid table : too short !")
+    (magic, version, kind, width, bits, length, count) = \
+        _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise Exception("Invalid table : bad magic !")
+    if version != VERSION:
+        raise Exception("Unsupported table version %d !" % version)
+    if kind not in (KIND_FIXED_BASE, KIND_WINDOW) or width < 1:
+        raise Exception("Invalid table : bad parameters !")
+    if count != _expectedEntries(kind, width, bits):
+        raise Exception("Invalid table : bad number of entries !")
+
+    offset = _HEADER.size + _DIGEST_SIZE
+    if len(view) != offset + 5 * length + 2 * length * count:
+        raise Exception("Invalid table : bad length !")
+    if verify:
+        h = hashlib.sha256(view[:_HEADER.size])
+        h.update(view[offset:])
+        if h.digest() != view[_HEADER.size:offset]:
+            raise Exception("Invalid table : bad checksum !")
+
+    values = [encoding.bytesToInt(view[offset + i * length:
+                                       offset + (i + 1) * length])
+              for i in range(5)]
+    (a, b, p, x, y) = values
+    if curve is None:
+        curve = ECC(a, b, p)
+    elif (curve.a % curve.p, curve.b % curve.p, curve.p) != (a, b, p):
+        raise Exception("Table is for another curve !")
+    point = curve.newPoint(x, y)
+
+    offset += 5 * length
+    if kind == KIND_FIXED_BASE:
+        per_row = (1 << width) - 1
+        rows = MappedRows(view, offset, length, count // per_row, per_row)
+        if not lazy:
+            rows = [row[:] for row in rows]
+        table = ECCFixedBaseTable(point, bits, width, rows)
+    else:
+        odd = MappedEntries(view, offset, length, count)
+        if not lazy:
+            odd = odd[:]
+        table = ECCWindowTable(point, width, odd)
+
+    if not table.check():
+        raise Exception("Invalid table : bad entries !")
+    return table
+
+def loadTable(path, curve=None, verify=True, lazy=False):
+    """
+    Load a table saved by saveTable, mapping the file in memory
+    (see parseTable). With lazy, the mapping stays open while the table
+    is used, otherwise it's closed once the entries are decoded.
+    """
+    with open(path, 'rb') as fd:
+        mapping = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+    if lazy:
+        return parseTable(mapping, curve, verify, True)
+    try:
+        return parseTable(mapping, curve, verify)
+    finally:
+        try:
+            mapping.close()
+        except BufferError:
+            pass
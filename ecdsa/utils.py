@@ -2,36 +2,80 @@
 Utilities functions for modular arithmetic, generating random integers...
 """
 
-from random import randint
-import binascii
+from . import instrument
+from collections import OrderedDict
 import os
+import threading
 
 
-def hashMessage(hash_fct, m, n):
-    """ FIPS-186-4 hashing, handle case when log2(h) > log2(n) """
-
-    h = hash_fct(m).digest()
+def hashDigest(h, n):
+    """
+    FIPS-186-4 conversion of a hash to an integer, keeping the leftmost
+    bits when log2(h) > log2(n). h is a digest (bytes) or a hashlib object
+    already fed with the message.
+    """
+    if not isinstance(h, (bytes, bytearray, memoryview)):
+        h = h.digest()
     h_length = len(h) * 8
     n_length = n.bit_length()
-    h = int(binascii.hexlify(h), 16)
+    h = int.from_bytes(h, 'big')
     if n_length < h_length:
         h >>= h_length - n_length
 
     return h
 
+def hashMessage(hash_fct, m, n):
+    """ FIPS-186-4 hashing, handle case when log2(h) > log2(n) """
+    return hashDigest(hashBytes(hash_fct, m), n)
+
+def hashBytes(hash_fct, m):
+    """ Digest of the message m """
+    if instrument.enabled:
+        start = instrument.now()
+        digest = hash_fct(m).digest()
+        instrument.record('hash', instrument.now() - start)
+        return digest
+    return hash_fct(m).digest()
+
+def hashStream(hash_fct, stream, chunkSize=65536):
+    """
+    Hash a message given as a file object (read in chunks of chunkSize
+    bytes) or as an iterable of chunks. Return the hashlib object.
+    """
+    start = instrument.now() if instrument.enabled else None
+    h = hash_fct()
+    if hasattr(stream, 'read'):
+        chunk = stream.read(chunkSize)
+        while chunk:
+            h.update(chunk)
+            chunk = stream.read(chunkSize)
+    else:
+        for chunk in stream:
+            h.update(chunk)
+    if start is not None:
+        instrument.record('hash', instrument.now() - start)
+    return h
+
 def randomInteger(numBytes):
     """ Generate a cryptographic secure integer, 0 <= r < 2**8*numBytes """
     assert numBytes > 0
-    r = os.urandom(numBytes)
-    return int(binascii.hexlify(r), 16)
+    return int.from_bytes(os.urandom(numBytes), 'big')
 
 def randomIntegerUnbias(n):
     """ Return an integer between 1 and n-1 without any potential biais"""
     assert n > 1
-    nbytes = n.bit_length() // 8 + 1
-    r = randomInteger(nbytes)
+    if n == 2:
+        return 1
+    # Draw exactly as many bits as n - 2 has, so less than half of the
+    # draws are rejected
+    nbits = (n - 2).bit_length()
+    nbytes = (nbits + 7) // 8
+    excess = nbytes * 8 - nbits
+    r = randomInteger(nbytes) >> excess
     while r > n - 2:
-        r = randomInteger(nbytes)
+        if instrument.enabled:
+            instrument.count('random.rejection')
+        r = randomInteger(nbytes) >> excess
     return r + 1
 
 
@@ -45,32 +89,165 @@ def xgcd(a, b):
     return  b, y0, x0
 
 def invMod(a, n):
-    """ Return the modular inverse of a (mod n) """
-    (g, u, v) = xgcd(a % n, n)
-    if g != 1:
+    """
+    Return the modular inverse of a (mod n).
+    The built-in pow is about 2.5x faster than xgcd, and much faster than
+    Fermat's a^(n-2) (see bench/bench_utils.py).
+    """
+    if instrument.enabled:
+        instrument.count('field.inversion')
+    try:
+        return pow(a, -1, n)
+    except ValueError:
         raise Exception("Can't find modular inverse : gcd(%d,%d) != 1" % (a, n))
-    return u%n
-
-def isPrime(n, k=64):
-    """ Miller-Rabin primality test """
-    if n < 2:
-        return False
-    for p in [2,3,5,7,11,13,17,19,23,29]:
-        if n % p == 0:
-            return n == p
-    s, d = 0, n-1
-    while d % 2 == 0:
-        s, d = s+1, d//2
-    for i in range(k):
-        x = pow(randint(2, n-1), d, n)
-        if x == 1 or x == n-1:
-            continue
-        for r in range(1, s):
-            x = (x * x) % n
-            if x == 1:
-                return False
-            if x == n-1:
-                break
+
+def sqrtMod(a, p):
+    """
+    Square root of a modulo the odd prime p, or None if a isn't a square.
+    A single exponentiation is needed when p = 3 (mod 4), Tonelli-Shanks
+    is used otherwise.
+    """
+    a %= p
+    if a == 0:
+        return 0
+    if pow(a, (p - 1) // 2, p) != 1:
+        return None
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+
+    # Tonelli-Shanks : p - 1 = q * 2^s, with q odd
+    (q, s) = (p - 1, 0)
+    while q % 2 == 0:
+        (q, s) = (q // 2, s + 1)
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+    (m, c, t, r) = (s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p))
+    while t != 1:
+        (i, t2) = (1, (t * t) % p)
+        while t2 != 1:
+            (i, t2) = (i + 1, (t2 * t2) % p)
+        b = pow(c, 1 << (m - i - 1), p)
+        (m, c) = (i, (b * b) % p)
+        (t, r) = ((t * c) % p, (r * b) % p)
+    return r
+
+def batchInvMod(values, n):
+    """
+    Return the modular inverses of all values (mod n), using Montgomery's
+    trick : only one modular inversion is done for the whole list
+    """
+    values = list(values)
+    if not values:
+        return []
+    prefix = [0] * len(values)
+    acc = 1
+    for i, v in enumerate(values):
+        prefix[i] = acc
+        acc = (acc * v) % n
+    acc_inv = invMod(acc, n)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = (acc_inv * prefix[i]) % n
+        acc_inv = (acc_inv * values[i]) % n
+    return result
+
+def wNAF(k, w):
+    """
+    Width-w Non-Adjacent Form of k >= 0, least significant digit first.
+    Non-zero digits are odd and in ]-2^(w-1), 2^(w-1)[, and are separated
+    by at least w-1 zeros.
+    """
+    digits = []
+    modulus = 1 << w
+    half = 1 << (w - 1)
+    while k > 0:
+        if k & 1:
+            d = k & (modulus - 1)
+            if d >= half:
+                d -= modulus
+            k -= d
         else:
-            return False
-    return True
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+def isPrime(n, k=None, *, certificate=None):
+    """
+    Primality test (see primality.isPrime). The test is deterministic, k
+    (the former number of Miller-Rabin rounds) is ignored.
+    """
+    from .primality import isPrime
+    return isPrime(n, certificate=certificate)
+
+class LRUCache:
+    """
+    Bounded mapping evicting the least recently used entries.
+    Attributes:
+          maxEntries: maximal number of entries (None for no limit)
+          maxBytes: maximal total size of the values (None for no limit)
+          sizeof: function giving the size in bytes of a value
+          hits, misses: lookup counters
+          evictions: number of entries evicted
+    """
+    def __init__(self, maxEntries=1024, maxBytes=None, sizeof=None):
+        if maxBytes is not None and sizeof is None:
+            raise Exception("A sizeof function is needed with maxBytes !")
+
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """ Return the value of key, and mark it as recently used """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """ Insert or replace a value, evicting old entries if needed """
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        with self.__lock:
+            old = self.__entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.__entries[key] = (value, size)
+            self.bytes += size
+
+            while self.__entries and (
+                    (self.maxEntries is not None and
+                     len(self.__entries) > self.maxEntries) or
+                    (self.maxBytes is not None and self.bytes > self.maxBytes)):
+                (_, (_, old_size)) = self.__entries.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+
+    def clear(self):
+        """ Remove all the entries (counters are kept) """
+        with self.__lock:
+            self.__entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """ Counters as a dict """
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self),
+                'bytes': self.bytes}
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
@@ -0,0 +1,39 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.aio import AsyncECDSA
+
+
+async def run(params):
+    (public, private) = params.genKeys()
+    async with AsyncECDSA(maxBatch=16, maxQueue=8) as front:
+        messages = [b'message %d' % i for i in range(40)]
+        sigs = await asyncio.gather(*[front.asign(private, m)
+                                      for m in messages])
+        results = await asyncio.gather(
+            *[front.averify(public, sig, m if i != 5 else b'!')
+              for (i, (sig, m)) in enumerate(zip(sigs, messages))])
+        assert results == [i != 5 for i in range(40)]
+
+        # A bad request only fails its own caller
+        results = await asyncio.gather(
+            front.averify(public, sigs[0], messages[0]),
+            front.averify(public, None, messages[1]),
+            front.asign(private, messages[2]),
+            front.asign(private, 'not bytes'),
+            return_exceptions=True)
+        assert results[0] is True
+        assert isinstance(results[1], Exception)
+        assert public.verify(results[2], messages[2])
+        assert isinstance(results[3], Exception)
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing asyncio front-end...")
+    sys.stdout.flush()
+    asyncio.run(run(ECDSAParamsP256()))
+    sys.stdout.write("OK\n")
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.archive import (SignatureArchive, INVALID_SIGNATURE, UNKNOWN_KEY,
+                           BAD_RECORD)
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing signature archive...")
+    sys.stdout.flush()
+
+    params = ECDSAParamsP256()
+    (public, private) = params.genKeys()
+    (other, _) = params.genKeys()
+    keys = {1: public, 2: other}
+
+    # Header, 6 records, then the messages
+    messages = [b'message %d' % i * 40 for i in range(6)]
+    prefix = b'junk'
+    start = (len(prefix) + len(SignatureArchive.packHeader(params, 0)) +
+             6 * SignatureArchive.recordSizeFor(params))
+    records = []
+    offset = start
+    for (i, m) in enumerate(messages):
+        keyId = 2 if i == 1 else 3 if i == 2 else 1
+        sign = private.sign(m)
+        length = len(m)
+        if i == 3:
+            sign = private.sign(b'another message')
+        if i == 4:
+            length += 100000
+        records.append(SignatureArchive.packRecord(params, keyId, sign,
+                                                   offset, length))
+        offset += len(m)
+    data = (prefix + SignatureArchive.packHeader(params, 6) +
+            b''.join(records) + b''.join(messages))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive')
+        with open(path, 'wb') as fd:
+            fd.write(data)
+
+        with SignatureArchive(path, params, len(prefix)) as archive:
+            assert len(archive) == 6
+            assert list(archive.failures(keys, batchSize=4)) == [
+                (1, 2, INVALID_SIGNATURE), (2, 3, UNKNOWN_KEY),
+                (3, 1, INVALID_SIGNATURE), (4, None, BAD_RECORD)]
+
+            # A message view held by the caller doesn't break close()
+            (keyId, sign, m) = archive.record(5)
+            assert bytes(m) == messages[5]
+        assert bytes(m) == messages[5]
+        m.release()
+
+        # Wrong offset, parameters or count
+        with open(path, 'wb') as fd:
+            fd.write(data[:-len(b''.join(messages)) - 1])
+        for (p, offset) in [(params, 0), (ECDSAParamsP384(), len(prefix)),
+                            (params, len(prefix))]:
+            try:
+                SignatureArchive(path, p, offset)
+                assert False
+            except AssertionError:
+                raise
+            except Exception:
+                pass
+
+    sys.stdout.write("OK\n")
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing LRU cache...")
+    sys.stdout.flush()
+
+    # Eviction by number of entries, least recently used first
+    cache = LRUCache(3)
+    for key in 'abc':
+        cache.put(key, key.upper())
+    assert cache.get('a') == 'A'
+    assert cache.get('z', 'default') == 'default'
+    cache.put('d', 'D')
+    assert 'b' not in cache and list('acd') == sorted(k for k in 'abcd'
+                                                      if k in cache)
+    cache.put('a', 'AA')
+    assert cache.get('a') == 'AA' and len(cache) == 3
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 1,
+                             'size': 3, 'bytes': 0}
+
+    # Eviction by size
+    cache = LRUCache(None, maxBytes=10, sizeof=len)
+    for value in ['aaaa', 'bbbb', 'cc']:
+        cache.put(value, value)
+    assert cache.bytes == 10 and len(cache) == 3
+    cache.get('aaaa')
+    cache.put('ddd', 'ddd')
+    assert 'bbbb' not in cache and 'aaaa' in cache
+    assert cache.bytes == 9 and cache.evictions == 1
+    cache.put('e' * 20, 'e' * 20)
+    assert len(cache) == 0 and cache.bytes == 0
+    cache.clear()
+    assert cache.stats()['evictions'] == 5
+
+    try:
+        LRUCache(maxBytes=10)
+        assert False
+    except AssertionError:
+        raise
+    except Exception:
+        pass
+    sys.stdout.write("OK\n")
+
+    sys.stdout.write("Testing public key cache...")
+    sys.stdout.flush()
+
+    params = ECDSAParamsP256()
+    keys = [params.genKeys() for _ in range(3)]
+    sigs = [private.sign(b'hello') for (_, private) in keys]
+
+    cache = enablePublicKeyCache(maxEntries=2, width=5)
+    assert publicKeyCache() is cache
+    tables = [public.table() for (public, _) in keys]
+    assert all(isinstance(table, ECCWindowTable) for table in tables)
+    assert tables[0].width == 5
+    assert cache.stats()['misses'] == 3 and cache.evictions == 1
+    assert keys[2][0].table() is tables[2]
+    assert keys[0][0].table() is not tables[0]
+    assert cache.hits == 1 and cache.misses == 4
+    for ((public, _), sig) in zip(keys, sigs):
+        assert public.verify(sig, b'hello')
+
+    # Budget in bytes : two tables fit, not three
+    size = ECCWindowTable(keys[0][0].p, 6).sizeInBytes()
+    cache = enablePublicKeyCache(maxEntries=None, maxBytes=2 * size + size // 2)
+    for (public, _) in keys:
+        public.table()
+    assert len(cache) == 2 and cache.evictions == 1
+    assert size <= cache.bytes <= 2 * size + size // 2
+
+    disablePublicKeyCache()
+    assert publicKeyCache() is None
+    assert keys[0][0].table() is keys[0][0].p
+    assert keys[0][0].verify(sigs[0], b'hello')
+
+    sys.stdout.write("OK\n")
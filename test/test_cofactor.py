@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+# y^2 = x^3 + 2x + 7 over F_1009 has 1047 = 3 * 349 points
+P, A, B, N, ORDER = 1009, 2, 7, 1047, 349
+
+
+def points(curve):
+    """ Points of the curve (without the infinite point) """
+    for x in range(P):
+        try:
+            y = curve.yFromX(x, 0)
+        except Exception:
+            continue
+        yield curve.newPoint(x, y)
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing cofactor 3 curve...")
+    sys.stdout.flush()
+
+    curve = ECC(A, B, P)
+    g = next(q for q in (3 * q for q in points(curve)) if not q.isInfinity())
+    bad = next(q for q in points(curve)
+               if not (ORDER * q).isInfinity())
+    good = 5 * g
+
+    for cofactor in (None, N // ORDER):
+        params = ECDSAParams(curve, g, ORDER, cofactor=cofactor)
+        assert ECDSAPublicKey(params, good).validate()
+        assert not ECDSAPublicKey(params, bad).validate()
+
+    # A result under wrong parameters isn't reused by the right ones
+    wrong = ECDSAParams(curve, g, ORDER, cofactor=1)
+    assert ECDSAPublicKey.fromBytes(wrong, bad.encode(), validate=True)
+    params = ECDSAParams(curve, g, ORDER)
+    assert not ECDSAPublicKey(params, bad).validate()
+    try:
+        ECDSAPublicKey.fromBytes(params, bad.encode(), validate=True)
+        assert False
+    except AssertionError:
+        raise
+    except Exception:
+        pass
+
+    (public, private) = params.genKeys()
+    assert public.verify(private.sign(b'hello world'), b'hello world')
+
+    sys.stdout.write("OK\n")
@@ -0,0 +1,98 @@
+import os
+import sys
+import binascii
+import tempfile
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+# SEC1 encoding of the P-256 generator
+P256_G = '046b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c2' \
+         '964fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5'
+
+
+if __name__ == '__main__':
+    params = ECDSAParamsP256()
+    g = params.generator
+    assert binascii.hexlify(g.encode()).decode() == P256_G
+    assert binascii.hexlify(g.encode(True)).decode() == '03' + P256_G[2:66]
+
+    for curve in [ECDSAParamsP192, ECDSAParamsP224, ECDSAParamsP256,
+                  ECDSAParamsP384, ECDSAParamsP521]:
+        sys.stdout.write("Testing %s..." % curve.name)
+        sys.stdout.flush()
+
+        params = curve()
+        (public, private) = params.genKeys()
+
+        for compressed in (False, True):
+            data = public.toBytes(compressed)
+            decoded = ECDSAPublicKey.fromBytes(params, memoryview(data))
+            assert decoded.p == public.p
+
+        decoded = ECDSAPrivateKey.fromBytes(params, private.toBytes())
+        assert decoded.toBytes() == private.toBytes()
+
+        sig = private.sign(b'hello world')
+        assert len(sig.toBytes()) == 2 * params.byteLength
+        assert ECDSASignature.fromBytes(params, sig.toBytes()) == sig
+        assert ECDSASignature.fromDER(params, sig.toDER()) == sig
+
+        # Non-minimal or truncated DER must be rejected
+        der = sig.toDER()
+        for bad in [der[:-1], der + b'\x00', b'\x31' + der[1:]]:
+            try:
+                ECDSASignature.fromDER(params, bad)
+                assert False
+            except AssertionError:
+                raise
+            except Exception:
+                pass
+
+        # Saved tables are loaded back through mmap, and corruption is detected
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'table')
+            for table in [params.generatorTable, ECCWindowTable(public.p)]:
+                saveTable(table, path)
+                k = params.order // 3
+                for lazy in (False, True):
+                    loaded = loadTable(path, params.curve, lazy=lazy)
+                    assert loaded.mul(k) == table.mul(k)
+
+            with open(path, 'r+b') as fd:
+                fd.seek(-1, os.SEEK_END)
+                last = fd.read(1)
+                fd.seek(-1, os.SEEK_END)
+                fd.write(b'\x00' if last != b'\x00' else b'\x01')
+            try:
+                loadTable(path, params.curve)
+                assert False
+            except AssertionError:
+                raise
+            except Exception:
+                pass
+
+        # Tables with a valid checksum but a wrong entry are rejected too
+        other = params.mulGenerator(12345)
+        table = params.generatorTable
+        rows = [list(row) for row in table.rows]
+        rows[3][5] = (other.x, other.y)
+        odd = list(ECCWindowTable(public.p).odd)
+        odd[2] = (other.x, other.y)
+        enablePublicKeyCache()
+        for bad in [ECCFixedBaseTable(table.point, table.bits, table.width,
+                                      rows),
+                    ECCWindowTable(public.p, 5, odd)]:
+            for func in [lambda: parseTable(dumpTable(bad), params.curve),
+                         lambda: cachePublicKeyTable(bad)]:
+                try:
+                    func()
+                    assert False
+                except AssertionError:
+                    raise
+                except Exception:
+                    pass
+        disablePublicKeyCache()
+
+        sys.stdout.write("OK\n")
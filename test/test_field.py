@@ -0,0 +1,37 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.field import PrimeField, SolinasField, MersenneField, NISTField
+
+
+if __name__ == '__main__':
+    for name in sorted(NIST_CURVES):
+        sys.stdout.write("Testing %s..." % name)
+        sys.stdout.flush()
+
+        cls = NIST_CURVES[name]
+        p = cls.p
+        fields = [PrimeField(p), SolinasField(p)]
+        if p & (p + 1) == 0:
+            fields.append(MersenneField(p))
+        else:
+            fields.append(NISTField(p))
+
+        values = [0, 1, p - 1, p, p + 1, (p - 1) ** 2, 3 * (p - 1) ** 2,
+                  (1 << (2 * p.bit_length())) - 1, -1, -(p - 1) ** 2]
+        values += [random.randrange(p) * random.randrange(p)
+                   for _ in range(2000)]
+        for field in fields:
+            for x in values:
+                assert field.reduce(x) == x % p
+
+            # The curve arithmetic gives the same results with each backend
+            curve = ECC(cls.a, cls.b, p, field)
+            g = curve.newPoint(cls.gx, cls.gy)
+            assert (cls.order - 1) * g == -g
+
+        sys.stdout.write("OK\n")
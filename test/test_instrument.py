@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa import instrument
+
+
+def counted(fct):
+    """ Counters incremented by fct() """
+    instrument.reset()
+    fct()
+    return instrument.counters()
+
+
+if __name__ == '__main__':
+    events = []
+    callback = lambda kind, name, value: events.append((kind, name, value))
+    instrument.addCallback(callback)
+
+    # P-256 uses the generic formulas, P-521 the ones of its field backend
+    for curve in [ECDSAParamsP256, ECDSAParamsP521]:
+        sys.stdout.write("Testing %s..." % curve.name)
+        sys.stdout.flush()
+
+        params = curve()
+        (public, private) = params.genKeys()
+        ecc = params.curve
+        g = ecc.toJacobian(params.generator)
+        g2 = ecc.jacobianDouble(g)
+        inf = ECC.JACOBIAN_INFINITY
+
+        # Nothing is recorded while disabled
+        instrument.reset()
+        del events[:]
+        assert public.verify(private.sign(b'hello'), b'hello')
+        assert instrument.counters() == {} and instrument.histograms() == {}
+        assert events == []
+
+        instrument.enable()
+        try:
+            # Each real operation is counted once, whatever the backend
+            assert counted(lambda: ecc.jacobianAdd(g, g)) == \
+                {'point.double': 1}
+            assert counted(lambda: ecc.jacobianAdd(g, g2)) == {'point.add': 1}
+            assert counted(lambda: ecc.jacobianAddAffine(g2, (g[0], g[1]))) \
+                == {'point.add': 1}
+            assert counted(lambda: ecc.jacobianAddAffine(g, (g[0], g[1]))) \
+                == {'point.double': 1}
+            assert counted(lambda: ecc.jacobianAdd(g, inf)) == {}
+            assert counted(lambda: ecc.jacobianAddAffine(g, None)) == {}
+            assert counted(lambda: ecc.jacobianDouble(inf)) == {}
+
+            # Constant time additions are counted apart
+            table = params.generatorTable
+            rows = len(table.rows)
+            assert counted(lambda: table.mulJacobian(1 + (1 << 8))) == \
+                {'point.add': 1, 'point.dummyAdd': rows - 2}
+            assert counted(lambda: table.mulJacobian(1 + (1 << 8), False)) \
+                == {'point.add': 1}
+
+            # Latencies and callbacks
+            instrument.reset()
+            del events[:]
+            sig = private.sign(b'hello')
+            assert public.verify(sig, b'hello')
+            assert verifyBatch([(public, sig, b'hello')]) == [True]
+            histograms = instrument.histograms()
+            for name in ['hash', 'sign', 'verify', 'verifyBatch']:
+                assert histograms[name]['count'] >= 1
+                assert histograms[name]['min'] <= histograms[name]['max']
+            assert histograms['hash']['count'] == 3
+            assert histograms['sign']['count'] == 1
+
+            totals = {}
+            for (kind, name, value) in events:
+                if kind == 'count':
+                    totals[name] = totals.get(name, 0) + value
+            assert totals == instrument.counters()
+            assert sum(1 for (kind, _, _) in events if kind == 'latency') == \
+                sum(h['count'] for h in histograms.values())
+        finally:
+            instrument.disable()
+
+        sys.stdout.write("OK\n")
+
+    instrument.removeCallback(callback)
+    instrument.reset()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+
+if __name__ == '__main__':
+    for curve in [ECDSAParamsP192, ECDSAParamsP256]:
+        sys.stdout.write("Testing %s..." % curve.name)
+        sys.stdout.flush()
+
+        params = curve()
+        g = params.generator
+
+        # n isn't a multiple of the chunk size
+        for (n, chunkSize) in [(20, 7), (300, 256), (1, 256)]:
+            keys = list(params.genKeysBatch(n, chunkSize))
+            assert len(keys) == n
+            for (public, private) in keys:
+                d = int.from_bytes(private.toBytes(), 'big')
+                assert public.p == g.multiply(d)
+                assert public.validate()
+            m = b'hello world'
+            assert keys[-1][0].verify(keys[-1][1].sign(m), m)
+
+        ds = [1, 2, 3, params.order - 1] + list(range(1000, 1011))
+        publics = list(params.derivePublicKeys(iter(ds), chunkSize=4))
+        assert [public.p for public in publics] == [g.multiply(d) for d in ds]
+
+        for bad in [0, params.order]:
+            try:
+                list(params.derivePublicKeys([5, bad]))
+                assert False
+            except AssertionError:
+                raise
+            except Exception:
+                pass
+
+        sys.stdout.write("OK\n")
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath('.')
+
+# Run in a fresh interpreter, so nothing is imported yet
+IMPORTS = '''
+import sys
+sys.path.insert(0, %r)
+import ecdsa
+assert [m for m in sys.modules if m.startswith('ecdsa.')] == []
+assert 'ECDSAParamsP256' in dir(ecdsa)
+try:
+    ecdsa.noSuchName
+    assert False
+except AttributeError:
+    pass
+ecdsa.ECC
+assert 'ecdsa.ecc' in sys.modules and 'ecdsa.nistCurves' not in sys.modules
+assert ecdsa.tables.loadTable is ecdsa.loadTable
+''' % ROOT
+
+SIGN = '''
+import sys
+sys.path.insert(0, %r)
+from ecdsa import *
+params = ECDSAParamsP256()
+(public, private) = params.genKeys()
+assert public.verify(private.sign(b'hello'), b'hello')
+''' % ROOT
+
+
+def run(code, cacheDir=None):
+    env = dict(os.environ)
+    env.pop('ECDSA_TABLE_CACHE', None)
+    if cacheDir is not None:
+        env['ECDSA_TABLE_CACHE'] = cacheDir
+    subprocess.check_call([sys.executable, '-c', code], env=env)
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing lazy imports and table cache...")
+    sys.stdout.flush()
+
+    run(IMPORTS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The first run saves the generator table, the next ones load it
+        run(SIGN, tmp)
+        files = os.listdir(tmp)
+        assert len(files) == 1 and files[0].endswith('.tbl')
+        path = os.path.join(tmp, files[0])
+        with open(path, 'rb') as fd:
+            data = fd.read()
+        os.utime(path, (0, 0))
+        run(SIGN, tmp)
+        assert os.stat(path).st_mtime == 0
+
+        # A corrupted or truncated file is rebuilt
+        for bad in [data[:-1] + bytes([data[-1] ^ 1]), data[:100], b'']:
+            with open(path, 'wb') as fd:
+                fd.write(bad)
+            run(SIGN, tmp)
+            with open(path, 'rb') as fd:
+                assert fd.read() == data
+        assert os.listdir(tmp) == files
+
+    sys.stdout.write("OK\n")
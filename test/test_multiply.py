@@ -0,0 +1,55 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+METHODS = ['ladder', 'window', 'wnaf']
+
+
+if __name__ == '__main__':
+    for curve in [ECDSAParamsP192, ECDSAParamsP256, ECDSAParamsP521]:
+        sys.stdout.write("Testing %s..." % curve.name)
+        sys.stdout.flush()
+
+        params = curve()
+        n = params.order
+        bits = n.bit_length()
+        point = params.mulGenerator(random.randrange(1, n))
+
+        scalars = [1, 2, 15, 16, n - 1, n + 1, (1 << bits) - 1]
+        scalars += [random.randrange(1, n) for _ in range(5)]
+        for k in scalars:
+            expected = point.multiply(k)
+            assert expected == k * point
+            for method in METHODS:
+                assert point.multiply(k, method) == expected
+                assert point.multiply(-k, method) == -expected
+                if k.bit_length() <= bits:
+                    assert point.multiply(k, method, bits) == expected
+            for secret in (True, False):
+                assert params.multiply(k, point, secret) == \
+                    point.multiply(k % n)
+                assert params.multiply(-k, point, secret) == \
+                    point.multiply(-k % n)
+
+        for method in METHODS:
+            assert point.multiply(n, method).isInfinity()
+            assert point.multiply(0, method).isInfinity()
+        for secret in (True, False):
+            assert params.multiply(n, point, secret).isInfinity()
+            assert params.multiply(0, point, secret).isInfinity()
+
+        # The secret scalar methods refuse scalars larger than bits
+        for method in ['ladder', 'window']:
+            try:
+                point.multiply(1 << bits, method, bits)
+                assert False
+            except AssertionError:
+                raise
+            except Exception:
+                pass
+
+        sys.stdout.write("OK\n")
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.parallel import ParallelSigner, ParallelVerifier
+from ecdsa.pool import NoncePool
+import multiprocessing
+import time
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing process pools...")
+    sys.stdout.flush()
+
+    params = ECDSAParamsP256()
+    keys = [params.genKeys() for _ in range(3)]
+    privates = dict(enumerate(private for (_, private) in keys))
+    publics = dict(enumerate(public for (public, _) in keys))
+    privates[1].deterministic = True
+    privates[1].sign(b'warm up')
+
+    requests = [(i % 3, b'message %d' % i) for i in range(20)]
+    for context in [None, 'spawn']:
+        with ParallelSigner(privates, 2, chunkSize=3,
+                            context=context) as signer:
+            sigs = list(signer.map(requests))
+            assert sigs[1] == privates[1].sign(requests[1][1])
+            sig = asyncio.run(signer.asign(0, b'hello'))
+            assert publics[0].verify(sig, b'hello')
+
+        items = [(key_id, sig, m if i != 7 else b'!')
+                 for (i, ((key_id, m), sig)) in enumerate(zip(requests, sigs))]
+        items.append((0, sigs[1], requests[1][1]))
+        with ParallelVerifier(publics, 2, chunkSize=3,
+                              context=context) as verifier:
+            assert list(verifier.map(items)) == [i != 7 for i in range(20)] \
+                + [False]
+            assert asyncio.run(verifier.averify(0, sig, b'hello'))
+
+    # Forked workers never reuse the nonces of the parent's pool
+    if 'fork' in multiprocessing.get_all_start_methods():
+        with NoncePool(params, low=8, high=32) as pool:
+            params.noncePool = pool
+            while len(pool) < 32:
+                time.sleep(0.01)
+            with ParallelSigner({0: privates[0]}, 4, chunkSize=1,
+                                context='fork') as signer:
+                sigs = list(signer.map([(0, b'%d' % i) for i in range(16)]))
+            sigs.append(privates[0].sign(b'parent'))
+            assert len(set(sig.r for sig in sigs)) == 17
+        params.noncePool = None
+
+    sys.stdout.write("OK\n")
@@ -0,0 +1,82 @@
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+from ecdsa.pool import KeyPool, NoncePool
+
+
+def waitFor(pool, depth):
+    """ Wait until the background thread fills the pool """
+    deadline = time.time() + 30
+    while len(pool) < depth:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing key and nonce pools...")
+    sys.stdout.flush()
+
+    params = ECDSAParamsP256()
+    g = params.generator
+
+    with KeyPool(params, low=2, high=5) as pool:
+        params.keyPool = pool
+        waitFor(pool, 5)
+        keys = [params.genKeys() for _ in range(8)]
+        for (public, private) in keys:
+            d = int.from_bytes(private.toBytes(), 'big')
+            assert public.p == g.multiply(d)
+        assert len(set(public.p.x for (public, _) in keys)) == 8
+        stats = pool.stats()
+        assert stats['hits'] + stats['misses'] == 8 and stats['hits'] >= 5
+    params.keyPool = None
+    assert len(pool) == 0
+
+    # Entries are handed out once, misses are generated synchronously
+    with NoncePool(params, low=1, high=4, start=False) as pool:
+        params.noncePool = pool
+        (public, private) = params.genKeys()
+        sigs = [private.sign(b'message %d' % i) for i in range(6)]
+        for (i, sig) in enumerate(sigs):
+            assert public.verify(sig, b'message %d' % i)
+        assert len(set(sig.r for sig in sigs)) == 6
+        assert pool.stats()['misses'] == 6
+
+        # Parameters holding pools can still be pickled
+        copy = pickle.loads(pickle.dumps(params))
+        assert copy.keyPool is None and copy.noncePool is None
+
+        pool.start()
+        waitFor(pool, 4)
+        (k, k_inv, r) = pool.pop()
+        assert (k * k_inv) % params.order == 1
+        assert r == params.mulGenerator(k).x % params.order
+    params.noncePool = None
+
+    # A forked child doesn't hand out the entries of its parent
+    if hasattr(os, 'fork'):
+        for cls in [KeyPool, NoncePool]:
+            with cls(params, low=4, high=8) as pool:
+                waitFor(pool, 8)
+                (rfd, wfd) = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    entries = [pool.pop() for _ in range(3)]
+                    os.write(wfd, pickle.dumps(entries))
+                    os._exit(0)
+                os.close(wfd)
+                with os.fdopen(rfd, 'rb') as fd:
+                    child = pickle.loads(fd.read())
+                os.waitpid(pid, 0)
+                parent = [pool.pop() for _ in range(3)]
+                if cls is KeyPool:
+                    (child, parent) = ([public.p.x for (public, _) in child],
+                                       [public.p.x for (public, _) in parent])
+                assert len(set(child) | set(parent)) == 6
+
+    sys.stdout.write("OK\n")
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+# Strong pseudoprimes to base 2, and Carmichael numbers
+COMPOSITES = [2047, 3277, 4033, 4681, 8321, 561, 41041, 825265,
+              3215031751, 3825123056546413051, 318665857834031151167461]
+
+# Pratt certificate of 2^61 - 1 (small factors are checked with Baillie-PSW)
+M61 = 2**61 - 1
+M61_CERTIFICATE = (37, dict.fromkeys([2, 3, 5, 7, 11, 13, 31, 41, 61, 151,
+                                      331, 1321]))
+
+
+if __name__ == '__main__':
+    sys.stdout.write("Testing primality...")
+    sys.stdout.flush()
+
+    sieve = [n for n in range(2, 10000)
+             if all(n % p for p in range(2, int(n ** 0.5) + 1))]
+    assert [n for n in range(10000) if isPrime(n)] == sieve
+
+    for n in COMPOSITES:
+        assert not isPrime(n)
+    for curve in NIST_CURVES.values():
+        assert isPrime(curve.order)
+        assert not isPrime(curve.order * curve.order)
+
+    assert isPrime(M61, certificate=M61_CERTIFICATE)
+    assert isPrime(M61, 32) and not isPrime(M61 + 2, 32)
+    assert not verifyCertificate(M61, (2, M61_CERTIFICATE[1]))
+    assert not verifyCertificate(M61, (37, {2: None, 3: None}))
+
+    sys.stdout.write("OK\n")
@@ -0,0 +1,48 @@
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+# RFC 6979 (appendix A.2) tests vectors for deterministic signatures
+VECTORS = [
+    (ECDSAParamsP192, hashlib.sha256,
+     '6FAB034934E4C0FC9AE67F5B5659A9D7D1FEFD187EE09FD4', b'sample',
+     '4B0B8CE98A92866A2820E20AA6B75B56382E0F9BFD5ECB55',
+     'CCDB006926EA9565CBADC840829D8C384E06DE1F1E381B85'),
+    (ECDSAParamsP256, hashlib.sha256,
+     'C9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721',
+     b'sample',
+     'EFD48B2AACB6A8FD1140DD9CD45E81D69D2C877B56AAF991C34D0EA84EAF3716',
+     'F7CB1C942D657C41D436C7A1B6E29F65F3E900DBB9AFF4064DC4AB2F843ACDA8'),
+    (ECDSAParamsP256, hashlib.sha256,
+     'C9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721',
+     b'test',
+     'F1ABB023518351CD71D881567B1EA663ED3EFCF6C5132B354F28D3B0B7D38367',
+     '019F4113742A2B14BD25926B49C649155F267E60D3814B4C0CC84250E46F0083'),
+]
+
+
+if __name__ == '__main__':
+    for (curve, hash_fct, d, m, r, s) in VECTORS:
+        sys.stdout.write("Testing %s - %s..." % (curve.name, m.decode()))
+        sys.stdout.flush()
+
+        params = curve(hash_fct)
+        private = ECDSAPrivateKey(params, int(d, 16), deterministic=True)
+
+        sig = private.sign(m)
+        assert sig.r == int(r, 16)
+        assert sig.s == int(s, 16)
+
+        # The key state must be reusable
+        sig = private.sign(m)
+        assert sig.r == int(r, 16)
+
+        # And picklable after use, e.g for a process pool
+        copy = pickle.loads(pickle.dumps(private))
+        assert copy.sign(m) == sig
+
+        sys.stdout.write("OK\n")
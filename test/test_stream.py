@@ -0,0 +1,52 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+
+def chunks(m, size):
+    for i in range(0, len(m), size):
+        yield m[i:i + size]
+
+
+if __name__ == '__main__':
+    message = bytes(range(256)) * 1000 + b'end'
+    for (curve, h) in [(ECDSAParamsP256, hashlib.sha256),
+                       (ECDSAParamsP192, hashlib.sha512)]:
+        sys.stdout.write("Testing %s - %s..." % (curve.name, h().name))
+        sys.stdout.flush()
+
+        params = curve(h)
+        (public, private) = params.genKeys()
+        private.deterministic = True
+        sig = private.sign(message)
+        digest = h(message).digest()
+
+        assert hashStream(h, io.BytesIO(message), 1000).digest() == digest
+        assert hashStream(h, chunks(message, 777)).digest() == digest
+        assert hashDigest(digest, params.order) == \
+            hashMessage(h, message, params.order)
+
+        # Every way to give the message gives the same signature
+        for other in [private.signStream(io.BytesIO(message)),
+                      private.signStream(chunks(message, 4096)),
+                      private.signDigest(digest),
+                      private.signDigest(h(message))]:
+            assert other == sig
+
+        for (check, data) in [(public.verify, message),
+                              (public.verifyStream, io.BytesIO(message)),
+                              (public.verifyStream, chunks(message, 100)),
+                              (public.verifyDigest, digest),
+                              (public.verifyDigest, h(message))]:
+            assert check(sig, data)
+
+        assert not public.verifyStream(sig, chunks(message[:-1], 100))
+        assert not public.verifyDigest(sig, h(message[:-1]))
+        assert public.verify(private.signStream(io.BytesIO(message),
+                                                deterministic=False), message)
+
+        sys.stdout.write("OK\n")
@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from ecdsa import *
+
+
+if __name__ == '__main__':
+    items = []
+    expected = []
+    for curve in [ECDSAParamsP192, ECDSAParamsP256, ECDSAParamsP384]:
+        params = curve()
+        n = params.order
+        (public, private) = params.genKeys()
+        (other, _) = params.genKeys()
+
+        for i in range(3):
+            m = b'message %d' % i
+            sig = private.sign(m)
+            (r, s) = (sig.r, sig.s)
+            cases = [
+                (public, sig, m, True),
+                (public, sig, m + b'!', False),
+                (other, sig, m, False),
+                (public, ECDSASignature(params, r + n, s), m, False),
+                (public, ECDSASignature(params, r, s + n), m, False),
+                (public, ECDSASignature(params, r, n - s), m, True),
+                (public, ECDSASignature(params, 0, s), m, False),
+                (public, ECDSASignature(params, r, 0), m, False),
+                (public, ECDSASignature(params, -r, s), m, False),
+            ]
+            for (key, sign, message, valid) in cases:
+                items.append((key, sign, message))
+                expected.append(valid)
+
+    sys.stdout.write("Testing verifyBatch...")
+    sys.stdout.flush()
+
+    assert [key.verify(sign, m) for (key, sign, m) in items] == expected
+    assert verifyBatch(items) == expected
+    assert verifyBatch(items[::-1]) == expected[::-1]
+    assert verifyBatch([]) == []
+
+    sys.stdout.write("OK\n")